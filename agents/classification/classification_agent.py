@@ -1,8 +1,11 @@
-from openai import OpenAI
+import json
 
+from agents.classification.classification_type import ClassificationType
+from agents.classification.json_formats import create_batch_classification_format, create_joint_classification_format
 from agents.utils.utils import build_messages, load_categories_from_yaml
-from utils.configuration import Config
 from utils.decorators import retry_with_exponential_backoff
+from utils.llm_cache import LLMResponseCache
+from utils.llm_client import LLMClient
 from utils.token_usage_counter import TokenUsageCounter
 
 
@@ -25,7 +28,7 @@ class ClassificationAgent:
         self.model_name = model_name
         self.temperature = temperature
         self.seed = seed
-        self.client = OpenAI(api_key=Config.user_upstage_api_key, base_url="https://api.upstage.ai/v1/solar")
+        self.client = LLMClient.get()
 
     @retry_with_exponential_backoff()
     def process(self, summary: str, classification_type: str) -> str:
@@ -39,12 +42,10 @@ class ClassificationAgent:
             str: 메일의 분류 결과입니다.
         """
 
-        categories = load_categories_from_yaml(classification_type, is_prompt=True)
-        categories_text = ""
-        for category in categories:
-            categories_text += f"카테고리 명: {category['name']}\n분류 기준: {category['rubric']}\n"
+        categories_text = self._build_categories_text(classification_type)
 
-        response = self.client.chat.completions.create(
+        response = LLMResponseCache.create(
+            self.client,
             model=self.model_name,
             messages=build_messages(
                 template_type="classification",
@@ -62,3 +63,118 @@ class ClassificationAgent:
         label: str = response.choices[0].message.content
 
         return label
+
+    @retry_with_exponential_backoff()
+    def process_joint(self, summary: str, n: int = 1) -> list[tuple[str, str]]:
+        """
+        카테고리와 처리 필요 여부를 JSON Schema 응답 한 번으로 함께 분류합니다.
+        일관성 투표를 위한 n개의 결과는 API의 n 파라미터로 한 번에 요청하며,
+        API가 n개보다 적은 결과를 반환하면 부족한 개수만큼 다시 요청합니다.
+
+        Args:
+            summary (str): 분류할 메일 요약문입니다.
+            n (int): 투표에 사용할 분류 결과 개수입니다.
+
+        Returns:
+            list[tuple[str, str]]: (카테고리, 처리 필요 여부) 분류 결과 리스트입니다.
+                형식이 잘못된 응답은 제외되므로 n개보다 적을 수 있습니다.
+        """
+        category_names = [category["name"] for category in load_categories_from_yaml(ClassificationType.CATEGORY)]
+        action_names = [action["name"] for action in load_categories_from_yaml(ClassificationType.ACTION)]
+        messages = build_messages(
+            template_type="classification",
+            target_range="single",
+            action="joint_classification",
+            mail=summary,
+            categories=self._build_categories_text(ClassificationType.CATEGORY),
+            actions=self._build_categories_text(ClassificationType.ACTION),
+        )
+
+        labels = []
+        for _ in range(n):
+            response = LLMResponseCache.create(
+                self.client,
+                model=self.model_name,
+                messages=messages,
+                response_format=create_joint_classification_format(category_names, action_names),
+                temperature=self.temperature,
+                seed=self.seed,
+                n=n - len(labels),
+            )
+            TokenUsageCounter.add_usage(self.__class__.__name__, "joint_classification", response.usage.total_tokens)
+
+            for choice in response.choices:
+                try:
+                    result = json.loads(choice.message.content)
+                except (TypeError, json.JSONDecodeError):
+                    continue
+                if result.get("category") in category_names and result.get("action") in action_names:
+                    labels.append((result["category"], result["action"]))
+
+            if len(labels) >= n:
+                break
+
+        return labels[:n]
+
+    @retry_with_exponential_backoff()
+    def process_batch(self, summaries: dict[str, str], n: int = 1) -> dict[str, list[tuple[str, str]]]:
+        """
+        여러 메일의 요약문을 한 번의 요청으로 분류합니다. 분류 기준은 요청마다 한 번만 전달됩니다.
+        응답에서 빠졌거나 라벨이 잘못된 메일은 결과에 포함되지 않으므로 호출하는 쪽에서 개별 분류로 처리해야 합니다.
+
+        Args:
+            summaries (dict[str, str]): {메일 ID: 요약문} 형태의 딕셔너리입니다.
+            n (int): 투표에 사용할 분류 결과 개수입니다. API의 n 파라미터로 요청합니다.
+
+        Returns:
+            dict[str, list[tuple[str, str]]]: {메일 ID: (카테고리, 처리 필요 여부) 분류 결과 리스트} 형태의 딕셔너리입니다.
+        """
+        category_names = [category["name"] for category in load_categories_from_yaml(ClassificationType.CATEGORY)]
+        action_names = [action["name"] for action in load_categories_from_yaml(ClassificationType.ACTION)]
+        mails_text = "".join(f"메일 ID: {mail_id}\n요약: {summary}\n\n" for mail_id, summary in summaries.items())
+
+        response = LLMResponseCache.create(
+            self.client,
+            model=self.model_name,
+            messages=build_messages(
+                template_type="classification",
+                target_range="batch",
+                action="classification",
+                mails=mails_text.strip(),
+                categories=self._build_categories_text(ClassificationType.CATEGORY),
+                actions=self._build_categories_text(ClassificationType.ACTION),
+            ),
+            response_format=create_batch_classification_format(list(summaries), category_names, action_names),
+            temperature=self.temperature,
+            seed=self.seed,
+            n=n,
+        )
+        TokenUsageCounter.add_usage(self.__class__.__name__, "batch_classification", response.usage.total_tokens)
+
+        labels = {}
+        for choice in response.choices:
+            try:
+                classifications = json.loads(choice.message.content)["classifications"]
+            except (TypeError, KeyError, json.JSONDecodeError):
+                continue
+
+            # 같은 응답에서 하나의 메일이 여러 번 분류된 경우 첫 번째 결과만 사용
+            choice_labels = {}
+            for result in classifications:
+                if not isinstance(result, dict):
+                    continue
+                mail_id, category, action = result.get("mail_id"), result.get("category"), result.get("action")
+                if mail_id in summaries and category in category_names and action in action_names:
+                    choice_labels.setdefault(mail_id, (category, action))
+
+            for mail_id, label in choice_labels.items():
+                labels.setdefault(mail_id, []).append(label)
+
+        return labels
+
+    def _build_categories_text(self, classification_type: str) -> str:
+        categories = load_categories_from_yaml(classification_type, is_prompt=True)
+        categories_text = ""
+        for category in categories:
+            categories_text += f"카테고리 명: {category['name']}\n분류 기준: {category['rubric']}\n"
+        return categories_text
@@ -0,0 +1,63 @@
+def create_label_properties(category_names: list[str], action_names: list[str]) -> dict:
+    # 각 라벨은 enum으로 제한하여 허용되지 않는 라벨이 생성되지 않도록 함
+    return {
+        "category": {
+            "type": "string",
+            "enum": category_names,
+            "description": "메일의 카테고리 이름입니다.",
+        },
+        "action": {
+            "type": "string",
+            "enum": action_names,
+            "description": "메일의 처리 필요 여부 이름입니다.",
+        },
+    }
+
+
+def create_joint_classification_format(category_names: list[str], action_names: list[str]) -> dict:
+    """
+    카테고리와 처리 필요 여부를 한 번에 분류하기 위한 JSON Schema response_format을 생성합니다.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "mail_classification",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": create_label_properties(category_names, action_names),
+                "required": ["category", "action"],
+            },
+        },
+    }
+
+
+def create_batch_classification_format(mail_ids: list[str], category_names: list[str], action_names: list[str]) -> dict:
+    """
+    여러 메일의 카테고리와 처리 필요 여부를 한 번에 분류하기 위한 JSON Schema response_format을 생성합니다.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "mail_batch_classification",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "classifications": {
+                        "type": "array",
+                        "description": "입력된 메일마다 하나씩 생성한 분류 결과입니다.",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "mail_id": {"type": "string", "enum": mail_ids, "description": "메일 ID입니다."},
+                                **create_label_properties(category_names, action_names),
+                            },
+                            "required": ["mail_id", "category", "action"],
+                        },
+                    }
+                },
+                "required": ["classifications"],
+            },
+        },
+    }
@@ -0,0 +1,195 @@
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from agents.embedding.bge_m3_embedding import Bgem3EmbeddingAgent
+from agents.embedding.embedding_store import EmbeddingStore
+from utils.configuration import Config
+
+HISTORY_COLUMNS = ["mail_id", "subject", "category", "action"]
+
+
+class KNNClassifier:
+    """
+    라벨이 있는 메일 제목의 bge-m3 임베딩으로 카테고리와 처리 필요 여부를 분류하는 kNN 분류기입니다.
+    유사한 이웃의 라벨이 충분히 일치하는 경우에만 답하고, 확신이 없으면 None을 반환하여 LLM 분류로 넘깁니다.
+
+    Args:
+        embedding_agent (Bgem3EmbeddingAgent): 텍스트 임베딩에 사용할 에이전트
+        k (int): 투표에 참여하는 최대 이웃 수
+        threshold (float): 유사도로 가중한 투표에서 선택된 라벨의 비율이 이 값 이상일 때만 답합니다.
+            카테고리와 처리 필요 여부 중 낮은 쪽의 비율을 신뢰도로 사용합니다.
+        min_similarity (float): 이 값보다 유사도가 낮은 이웃은 투표에서 제외합니다.
+        embedding_store (EmbeddingStore, optional): 지정하면 Gmail message id별로 제목 임베딩을 저장하여
+            이전 실행에서 임베딩한 예시와 메일은 다시 임베딩하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        embedding_agent: Bgem3EmbeddingAgent,
+        k: int = 5,
+        threshold: float = 0.8,
+        min_similarity: float = 0.6,
+        embedding_store: Optional[EmbeddingStore] = None,
+    ):
+        self.embedding_agent = embedding_agent
+        self.embedding_store = embedding_store
+        self.k = k
+        self.threshold = threshold
+        self.min_similarity = min_similarity
+
+        self.categories: list[str] = []
+        self.actions: list[str] = []
+        self._vectors: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_config(
+        cls, embedding_agent: Bgem3EmbeddingAgent, knn_config: dict, user_id: Optional[str] = None
+    ) -> "KNNClassifier":
+        """
+        config.yml의 classification.knn 설정으로 분류기를 만들고, 라벨 데이터와 user_id의 분류 기록을 학습합니다.
+        같은 mail_id가 두 곳에 모두 있으면 라벨 데이터(examples_path)를 우선합니다.
+        user_id가 None이면 라벨 데이터만 학습하고 임베딩을 저장하지 않습니다 (평가용).
+        embedding.store.enabled가 true이면 사용자별 저장소에 제목 임베딩을 저장합니다.
+        """
+        embedding_store = None
+        if user_id is not None and Config.config["embedding"]["store"]["enabled"]:
+            # 클러스터링용 저장소는 보관 기간이 지난 메일을 삭제하므로 분류 기록용 저장소를 분리
+            embedding_store = EmbeddingStore.for_user(user_id, embedding_agent.model_name, namespace="classification")
+        classifier = cls(
+            embedding_agent, knn_config["k"], knn_config["threshold"], knn_config["min_similarity"], embedding_store
+        )
+
+        examples_df = pd.read_csv(knn_config["examples_path"], encoding="utf-8-sig", dtype={"mail_id": str})
+        history_path = get_history_path(knn_config, user_id) if user_id is not None else None
+        if history_path is not None and os.path.exists(history_path):
+            history_df = pd.read_csv(history_path, encoding="utf-8", dtype={"mail_id": str})
+            examples_df = pd.concat([examples_df, history_df], ignore_index=True)
+        examples_df = examples_df.drop_duplicates(subset="mail_id", keep="first").dropna(subset=HISTORY_COLUMNS)
+
+        classifier.add_examples(
+            examples_df["subject"].tolist(),
+            examples_df["category"].tolist(),
+            examples_df["action"].tolist(),
+            examples_df["mail_id"].tolist(),
+        )
+        return classifier
+
+    def add_examples(
+        self, texts: list[str], categories: list[str], actions: list[str], message_ids: Optional[list[str]] = None
+    ):
+        if not texts:
+            return
+
+        vectors = self.embed(texts, message_ids)
+        self._vectors = vectors if self._vectors is None else np.vstack([self._vectors, vectors])
+        self.categories.extend(categories)
+        self.actions.extend(actions)
+
+    def embed(self, texts: list[str], message_ids: Optional[list[str]] = None) -> np.ndarray:
+        """
+        텍스트를 임베딩하여 정규화된 (개수, 차원) 행렬을 반환합니다.
+        embedding_store와 message_ids(Gmail message id)가 있으면 저장된 임베딩을 사용하고, 없는 텍스트만 임베딩합니다.
+        """
+        if self.embedding_store is None or message_ids is None:
+            vectors = self.embedding_agent.process_batch(texts)
+        else:
+            id_texts = dict(zip(message_ids, texts))
+            stored_vectors = self.embedding_store.get_many(id_texts)
+            missing_texts = {
+                message_id: text for message_id, text in id_texts.items() if message_id not in stored_vectors
+            }
+            if missing_texts:
+                new_vectors = dict(
+                    zip(missing_texts.keys(), self.embedding_agent.process_batch(list(missing_texts.values())))
+                )
+                stored_vectors.update(new_vectors)
+                self.embedding_store.add_many(missing_texts, new_vectors)
+                self.embedding_store.compact_if_stale()
+            vectors = np.stack([stored_vectors[message_id] for message_id in message_ids])
+
+        vectors = vectors.astype(np.float32)
+        return vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-10)
+
+    def predict(self, text: str) -> Optional[tuple[str, str]]:
+        """
+        Returns:
+            Optional[tuple[str, str]]: (카테고리, 처리 필요 여부). 신뢰도가 threshold보다 낮으면 None
+        """
+        return self.predict_vectors(self.embed([text]))[0]
+
+    def predict_vectors(self, query_vectors: np.ndarray, exclude_self: bool = False) -> list[Optional[tuple[str, str]]]:
+        """
+        정규화된 임베딩 벡터들을 한 번에 분류합니다.
+
+        Args:
+            query_vectors (np.ndarray): (질의 개수, 차원) 형태의 정규화된 벡터
+            exclude_self (bool): True이면 i번째 질의에서 i번째 학습 예시를 제외합니다 (leave-one-out 평가용).
+        """
+        if self._vectors is None:
+            return [None] * len(query_vectors)
+
+        similarity_matrix = query_vectors @ self._vectors.T
+        if exclude_self:
+            np.fill_diagonal(similarity_matrix, -np.inf)
+
+        k = min(self.k, similarity_matrix.shape[1])
+        neighbor_matrix = np.argpartition(-similarity_matrix, k - 1, axis=1)[:, :k]
+        return [
+            self._vote(neighbors[similarities[neighbors] >= self.min_similarity], similarities)
+            for neighbors, similarities in zip(neighbor_matrix, similarity_matrix)
+        ]
+
+    def predict_leave_one_out(self) -> list[Optional[tuple[str, str]]]:
+        """
+        학습 예시 각각을 자신을 제외한 나머지 예시로 분류합니다. 분류기 평가에 사용합니다.
+        """
+        if self._vectors is None:
+            return []
+        return self.predict_vectors(self._vectors, exclude_self=True)
+
+    def _vote(self, neighbors: np.ndarray, similarities: np.ndarray) -> Optional[tuple[str, str]]:
+        if len(neighbors) == 0:
+            return None
+
+        weights = similarities[neighbors]
+        category, category_confidence = self._weighted_vote([self.categories[i] for i in neighbors], weights)
+        action, action_confidence = self._weighted_vote([self.actions[i] for i in neighbors], weights)
+        if min(category_confidence, action_confidence) < self.threshold:
+            return None
+        return category, action
+
+    @staticmethod
+    def _weighted_vote(labels: list[str], weights: np.ndarray) -> tuple[str, float]:
+        scores: dict[str, float] = {}
+        for label, weight in zip(labels, weights):
+            scores[label] = scores.get(label, 0.0) + float(weight)
+
+        best_label = max(scores, key=scores.get)
+        return best_label, scores[best_label] / sum(scores.values())
+
+
+def get_history_path(knn_config: dict, user_id: str) -> str:
+    """
+    사용자별 분류 기록 CSV 경로({classification.knn.history_path}/{user_id}.csv)를 반환합니다.
+    """
+    return os.path.join(knn_config["history_path"], f"{user_id}.csv")
+
+
+def append_history(history_path: str, rows: list[dict[str, str]]):
+    """
+    LLM으로 분류한 메일을 kNN 분류기의 학습 데이터로 누적합니다.
+
+    Args:
+        history_path (str): 분류 기록 CSV 경로 (get_history_path)
+        rows (list[dict[str, str]]): mail_id(Gmail message id), subject, category, action을 가진 딕셔너리 리스트
+    """
+    if not rows:
+        return
+
+    os.makedirs(os.path.dirname(history_path) or ".", exist_ok=True)
+    pd.DataFrame(rows, columns=HISTORY_COLUMNS).to_csv(
+        history_path, mode="a", header=not os.path.exists(history_path), index=False, encoding="utf-8"
+    )
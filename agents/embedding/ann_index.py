@@ -0,0 +1,242 @@
+import os
+import re
+import time
+from typing import Optional
+
+import numpy as np
+
+from agents.embedding.similarity_search import normalize_rows
+from utils.configuration import Config
+
+
+class IVFIndex:
+    """
+    코사인 유사도로 근사 최근접 이웃을 찾는 IVF(inverted file) 인덱스입니다.
+    벡터를 k-means 중심(centroid)별 목록으로 나누어 두고, 질의와 가까운 n_probe개 목록의 벡터만 비교합니다.
+
+    벡터가 min_train_size개보다 적거나 아직 학습하지 않은 경우에는 모든 벡터와 비교(exact search)합니다.
+    학습 이후 추가된 벡터는 가장 가까운 중심의 목록에 들어가며, 벡터 수가 학습 시점의 2배가 되거나
+    절반 아래로 줄면 중심을 다시 학습합니다.
+
+    Args:
+        n_probe (int): 질의마다 비교할 목록 수. 클수록 recall이 높아지고 느려집니다.
+        min_train_size (int): 중심을 학습하기 위한 최소 벡터 수
+    """
+
+    def __init__(self, n_probe: int = 8, min_train_size: int = 256):
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+
+        self.ids: list[str] = []
+        self.vectors: Optional[np.ndarray] = None
+        self.timestamps = np.empty(0, dtype=np.float64)
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.empty(0, dtype=np.int64)
+        self.trained_size = 0
+
+        self._row_by_id: dict[str, int] = {}
+        self._list_order: Optional[np.ndarray] = None
+        self._list_bounds: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def for_user(cls, user_id: str, model_name: str) -> tuple["IVFIndex", str]:
+        """
+        config.yml의 embedding.history 설정으로 사용자와 모델별 인덱스를 불러옵니다. 파일이 없으면 빈 인덱스를 만듭니다.
+
+        Returns:
+            tuple[IVFIndex, str]: (인덱스, 저장 경로)
+        """
+        history_config = Config.config["embedding"]["history"]
+        safe_model_name = re.sub(r"[^\w.-]", "_", model_name)
+        path = os.path.join(history_config["path"], str(user_id), f"{safe_model_name}.npz")
+        index = cls(history_config["n_probe"], history_config["min_train_size"])
+        if os.path.exists(path):
+            index.load(path)
+        return index, path
+
+    def add(self, ids: list[str], vectors: np.ndarray, timestamps: Optional[np.ndarray] = None):
+        """
+        벡터를 추가합니다. 이미 있는 id는 새 벡터로 교체합니다.
+
+        Args:
+            ids (list[str]): 벡터 id (Gmail message id)
+            vectors (np.ndarray): (개수, 차원) 형태의 벡터. 정규화하여 저장합니다.
+            timestamps (np.ndarray, optional): 추가된 시각(초). None이면 현재 시각을 사용합니다.
+        """
+        if len(ids) == 0:
+            return
+
+        self.remove([vector_id for vector_id in ids if vector_id in self._row_by_id])
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        timestamps = np.full(len(ids), time.time()) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+
+        start = len(self.ids)
+        self.ids.extend(ids)
+        self._row_by_id.update({vector_id: start + offset for offset, vector_id in enumerate(ids)})
+        self.vectors = vectors if self.vectors is None else np.vstack([self.vectors, vectors])
+        self.timestamps = np.concatenate([self.timestamps, timestamps])
+        if self.centroids is not None:
+            self.assignments = np.concatenate([self.assignments, self._assign(vectors)])
+        self._list_order = None
+
+        if self._needs_training():
+            self.train()
+
+    def remove(self, ids: list[str]) -> int:
+        """
+        id의 벡터를 삭제하고 삭제한 개수를 반환합니다. 없는 id는 무시합니다.
+        """
+        rows = [self._row_by_id[vector_id] for vector_id in ids if vector_id in self._row_by_id]
+        if not rows:
+            return 0
+
+        keep = np.ones(len(self.ids), dtype=bool)
+        keep[rows] = False
+        self._keep_rows(keep)
+        return len(rows)
+
+    def remove_older_than(self, timestamp: float) -> list[str]:
+        """
+        timestamp 이전에 추가된 벡터를 삭제하고 삭제한 id를 반환합니다. 보관 기간이 지난 메일 정리에 사용합니다.
+        """
+        keep = self.timestamps >= timestamp
+        removed_ids = [vector_id for vector_id, is_kept in zip(self.ids, keep) if not is_kept]
+        if removed_ids:
+            self._keep_rows(keep)
+        return removed_ids
+
+    def train(self, n_iterations: int = 10, seed: int = 0):
+        """
+        spherical k-means로 목록 중심을 학습하고 모든 벡터를 다시 배정합니다. 목록 수는 sqrt(벡터 수)입니다.
+        """
+        if len(self.ids) < self.min_train_size:
+            self.centroids = None
+            self.assignments = np.empty(0, dtype=np.int64)
+            self.trained_size = 0
+            self._list_order = None
+            return
+
+        rng = np.random.default_rng(seed)
+        n_lists = max(int(np.sqrt(len(self.ids))), 1)
+        centroids = self.vectors[rng.choice(len(self.ids), n_lists, replace=False)]
+        for _ in range(n_iterations):
+            self.centroids = centroids
+            assignments = self._assign(self.vectors)
+            order = np.argsort(assignments, kind="stable")
+            list_sizes = np.bincount(assignments, minlength=n_lists)
+            non_empty = list_sizes > 0
+
+            # 빈 목록의 중심은 임의의 벡터로 다시 초기화
+            centroids = self.vectors[rng.choice(len(self.ids), n_lists)]
+            starts = np.concatenate([[0], np.cumsum(list_sizes)[:-1]])
+            centroids[non_empty] = np.add.reduceat(self.vectors[order], starts[non_empty], axis=0)
+            centroids = normalize_rows(centroids)
+
+        self.centroids = centroids
+        self.assignments = self._assign(self.vectors)
+        self.trained_size = len(self.ids)
+        self._list_order = None
+
+    def search(
+        self, query_vectors: np.ndarray, k: int = 10, threshold: float = -np.inf, exact: bool = False
+    ) -> list[list[tuple[str, float]]]:
+        """
+        질의마다 코사인 유사도가 threshold 이상인 최대 k개의 (id, 유사도)를 유사도 내림차순으로 반환합니다.
+
+        Args:
+            query_vectors (np.ndarray): (질의 개수, 차원) 형태의 벡터
+            k (int): 질의마다 반환할 최대 이웃 수
+            threshold (float): 최소 유사도
+            exact (bool): True이면 목록을 사용하지 않고 모든 벡터와 비교합니다 (recall 측정용).
+        """
+        query_vectors = normalize_rows(np.asarray(query_vectors, dtype=np.float32))
+        if not self.ids:
+            return [[] for _ in query_vectors]
+
+        if exact or self.centroids is None:
+            return [self._top_k(np.arange(len(self.ids)), query, k, threshold) for query in query_vectors]
+
+        self._build_lists()
+        n_probe = min(self.n_probe, len(self.centroids))
+        probe_matrix = np.argpartition(-(query_vectors @ self.centroids.T), n_probe - 1, axis=1)[:, :n_probe]
+        results = []
+        for query, probe_lists in zip(query_vectors, probe_matrix):
+            candidate_rows = np.concatenate(
+                [self._list_order[self._list_bounds[i] : self._list_bounds[i + 1]] for i in probe_lists]
+            )
+            results.append(self._top_k(candidate_rows, query, k, threshold))
+        return results
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        dim = self.vectors.shape[1] if self.vectors is not None else 0
+        # 저장 중 중단되어도 이전 파일이 유지되도록 임시 파일에 쓴 뒤 교체
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            np.savez(
+                file,
+                ids=np.array(self.ids, dtype=str),
+                vectors=self.vectors if self.vectors is not None else np.empty((0, dim), dtype=np.float32),
+                timestamps=self.timestamps,
+                centroids=self.centroids if self.centroids is not None else np.empty((0, dim), dtype=np.float32),
+                assignments=self.assignments,
+                trained_size=np.array(self.trained_size),
+            )
+        os.replace(temp_path, path)
+
+    def load(self, path: str):
+        with np.load(path, allow_pickle=False) as data:
+            self.ids = data["ids"].tolist()
+            self.vectors = data["vectors"] if len(self.ids) else None
+            self.timestamps = data["timestamps"]
+            self.centroids = data["centroids"] if len(data["centroids"]) else None
+            self.assignments = data["assignments"]
+            self.trained_size = int(data["trained_size"])
+        self._row_by_id = {vector_id: row for row, vector_id in enumerate(self.ids)}
+        self._list_order = None
+
+    # built-in functions
+    def _needs_training(self) -> bool:
+        if len(self.ids) < self.min_train_size:
+            return self.centroids is not None
+        return self.centroids is None or not self.trained_size / 2 <= len(self.ids) <= self.trained_size * 2
+
+    def _assign(self, vectors: np.ndarray, block_size: int = 4096) -> np.ndarray:
+        return np.concatenate(
+            [
+                np.argmax(vectors[start : start + block_size] @ self.centroids.T, axis=1)
+                for start in range(0, len(vectors), block_size)
+            ]
+        )
+
+    def _build_lists(self):
+        # 목록별 벡터 행 번호: _list_order[_list_bounds[i]:_list_bounds[i + 1]]
+        if self._list_order is not None:
+            return
+        self._list_order = np.argsort(self.assignments, kind="stable")
+        self._list_bounds = np.concatenate(
+            [[0], np.cumsum(np.bincount(self.assignments, minlength=len(self.centroids)))]
+        )
+
+    def _top_k(self, rows: np.ndarray, query: np.ndarray, k: int, threshold: float) -> list[tuple[str, float]]:
+        scores = self.vectors[rows] @ query
+        selected = np.nonzero(scores >= threshold)[0]
+        if len(selected) > k:
+            selected = selected[np.argpartition(-scores[selected], k - 1)[:k]]
+        selected = selected[np.argsort(-scores[selected])]
+        return [(self.ids[rows[i]], float(scores[i])) for i in selected]
+
+    def _keep_rows(self, keep: np.ndarray):
+        self.ids = [vector_id for vector_id, is_kept in zip(self.ids, keep) if is_kept]
+        self._row_by_id = {vector_id: row for row, vector_id in enumerate(self.ids)}
+        self.vectors = self.vectors[keep] if self.ids else None
+        self.timestamps = self.timestamps[keep]
+        if self.centroids is not None:
+            self.assignments = self.assignments[keep]
+        self._list_order = None
+
+        if self._needs_training():
+            self.train()
@@ -1,13 +1,50 @@
+import threading
+
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from agents.embedding.sentence_splitter import split_sentences
+from utils.configuration import Config
 from utils.decorators import retry_with_exponential_backoff
 
+DEFAULT_MODEL_NAME = "upskyy/bge-m3-korean"
+
 
 class Bgem3EmbeddingAgent:
-    def __init__(self, model_name: str = "upskyy/bge-m3-korean"):
-        self.model = SentenceTransformer(model_name)
+    """
+    bge-m3 모델로 텍스트를 임베딩합니다.
+    모델은 처음 사용할 때 한 번만 로드하고 프로세스 전체에서 공유하므로, 여러 사용자를 처리하는 배치 실행에서도
+    로드 비용은 한 번만 듭니다.
+    """
+
+    _models: dict[str, SentenceTransformer] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME):
+        self.model_name = model_name
+
+    @property
+    def model(self) -> SentenceTransformer:
+        return self.load_model(self.model_name)
+
+    @classmethod
+    def load_model(cls, model_name: str = DEFAULT_MODEL_NAME) -> SentenceTransformer:
+        """
+        공유 모델을 반환합니다. 아직 로드되지 않았다면 config.yml의 embedding 설정으로 로드합니다.
+        """
+        with cls._lock:
+            if model_name not in cls._models:
+                # safetensors 가중치는 memory-map으로 읽히며, fp16이면 가중치를 처음부터 float16으로 로드해 메모리를 절반으로 줄임
+                model_kwargs = {"torch_dtype": "float16"} if Config.config["embedding"]["fp16"] else None
+                cls._models[model_name] = SentenceTransformer(model_name, model_kwargs=model_kwargs)
+            return cls._models[model_name]
+
+    @classmethod
+    def warm_up(cls, model_name: str = DEFAULT_MODEL_NAME):
+        """
+        모델을 로드하고 한 번 실행하여, 첫 요청에서 모델 로드와 초기화 비용이 발생하지 않도록 합니다.
+        """
+        cls.load_model(model_name).encode(["warm up"])
 
     @retry_with_exponential_backoff()
     def process(self, summary: str):
@@ -19,3 +56,35 @@ class Bgem3EmbeddingAgent:
         mean_pooled_vector = np.mean(embedding_matrix, axis=0)
 
         return mean_pooled_vector
+
+    @retry_with_exponential_backoff()
+    def process_batch(self, summaries: list[str], batch_size: int = 32) -> np.ndarray:
+        """
+        여러 텍스트의 문장을 모두 모아 한 번의 encode 호출로 임베딩한 뒤, 텍스트별로 평균 풀링합니다.
+        텍스트마다 encode를 호출하는 process와 같은 벡터를 반환하면서 작은 배치를 반복해서 실행하지 않습니다.
+
+        Args:
+            summaries (list[str]): 임베딩할 텍스트 리스트
+            batch_size (int): encode의 배치 크기. encode가 문장을 길이순으로 정렬해 배치를 구성합니다.
+
+        Returns:
+            np.ndarray: (텍스트 개수, 차원) 형태의 평균 풀링 벡터. 문장이 없는 텍스트는 0 벡터입니다.
+        """
+        splitted_sentences = [split_sentences(summary) for summary in summaries]
+        sentence_counts = np.array([len(sentences) for sentences in splitted_sentences])
+        # offsets[i]:offsets[i + 1]이 i번째 텍스트의 문장 범위
+        offsets = np.concatenate([[0], np.cumsum(sentence_counts)])
+
+        all_sentences = [sentence for sentences in splitted_sentences for sentence in sentences]
+        embedding_matrix = self.model.encode(all_sentences, batch_size=batch_size, convert_to_numpy=True)
+        if len(all_sentences) == 0:
+            return np.zeros((len(summaries), self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # 문장이 있는 텍스트만 구간 합을 구하고 문장 수로 나눔 (빈 구간은 reduceat 결과가 정의되지 않음)
+        mean_pooled_matrix = np.zeros((len(summaries), embedding_matrix.shape[1]), dtype=embedding_matrix.dtype)
+        has_sentences = sentence_counts > 0
+        mean_pooled_matrix[has_sentences] = (
+            np.add.reduceat(embedding_matrix, offsets[:-1][has_sentences], axis=0)
+            / sentence_counts[has_sentences, None]
+        )
+        return mean_pooled_matrix
@@ -1,10 +1,14 @@
-from typing import Callable, TypedDict
+from typing import Callable, Optional, TypedDict
 
 import numpy as np
 
+from agents.embedding.ann_index import IVFIndex
 from agents.embedding.bge_m3_embedding import Bgem3EmbeddingAgent
+from agents.embedding.embedding_store import EmbeddingStore
+from agents.embedding.similarity_search import SimilarPairs, search_similar
 from agents.embedding.upstage_embedding import UpstageEmbeddingAgent
 from gmail_api.mail import Mail
+from utils.configuration import Config
 
 
 class SimilarityDict(TypedDict):
@@ -15,11 +19,28 @@ class SimilarityDict(TypedDict):
     mail_id: list[SimilarityEntry]
 
 
-def _compute_dot_product_similarity(embedding_vectors: dict[str, np.ndarray]) -> SimilarityDict:
-    mail_ids = list(embedding_vectors.keys())
-    embedding_matrix = np.array(list(embedding_vectors.values()))
-    similarity_matrix = np.dot(embedding_matrix, embedding_matrix.T)
+def _compute_dot_product_similarity(
+    embedding_matrix: np.ndarray, threshold: float, top_k: Optional[int] = None
+) -> SimilarPairs:
+    return search_similar(
+        embedding_matrix, threshold, top_k, block_size=Config.config["embedding"]["similarity_block_size"]
+    )
 
+
+def _compute_cosine_similarity(
+    embedding_matrix: np.ndarray, threshold: float, top_k: Optional[int] = None
+) -> SimilarPairs:
+    # 코사인 유사도 = 정규화한 벡터의 내적
+    return search_similar(
+        embedding_matrix,
+        threshold,
+        top_k,
+        normalize=True,
+        block_size=Config.config["embedding"]["similarity_block_size"],
+    )
+
+
+def _to_similarity_dict(mail_ids: list[str], similar_pairs: SimilarPairs) -> SimilarityDict:
     # {
     #   "mail_id_1": [
     #       ("top_1_mail_id", 0.xxx),
@@ -28,32 +49,9 @@ def _compute_dot_product_similarity(embedding_vectors: dict[str, np.ndarray]) ->
     #   "mail_id_2": [],
     #   ...
     # }
-    similar_results: SimilarityDict = {
-        mail_ids[i]: [
-            (mail_ids[j], float(similarity_matrix[i][j])) for j in np.argsort(-similarity_matrix[i]) if j != i
-        ]
-        for i in range(len(mail_ids))
-    }
-
-    return similar_results
-
-
-def _compute_cosine_similarity(embedding_vectors: dict[str, np.ndarray]) -> SimilarityDict:
-    mail_ids = list(embedding_vectors.keys())
-    embedding_matrix = np.array(list(embedding_vectors.values()))
-
-    # 코사인 유사도 행렬 계산
-    norm_matrix = np.linalg.norm(embedding_matrix, axis=1, keepdims=True)
-    normalized_embeddings = embedding_matrix / (norm_matrix + 1e-10)  # 0으로 나누는 것 방지
-    similarity_matrix = np.dot(normalized_embeddings, normalized_embeddings.T)
-
-    similar_results: SimilarityDict = {
-        mail_ids[i]: [
-            (mail_ids[j], float(similarity_matrix[i][j])) for j in np.argsort(-similarity_matrix[i]) if j != i
-        ]
-        for i in range(len(mail_ids))
-    }
-
+    similar_results: SimilarityDict = {mail_id: [] for mail_id in mail_ids}
+    for i, j, score in zip(*similar_pairs):
+        similar_results[mail_ids[i]].append((mail_ids[j], float(score)))
     return similar_results
 
 
@@ -63,7 +61,10 @@ class EmbeddingManager:
         embedding_model_name: str,
         similarity_metric: str,
         similarity_threshold: float = 0.51,
+        similarity_top_k: Optional[int] = None,
         is_save_results: bool = False,
+        embedding_store: Optional[EmbeddingStore] = None,
+        history_index: Optional[IVFIndex] = None,
     ):
         self.model_name = embedding_model_name
 
@@ -75,38 +76,95 @@ class EmbeddingManager:
             raise ValueError(f"{embedding_model_name}은 유효한 임베딩 모델명이 아닙니다.")
 
         if similarity_metric == "dot-product":
-            self.compute_similarity: Callable[[dict[str, np.ndarray]], SimilarityDict] = _compute_dot_product_similarity
+            self.compute_similarity: Callable[..., SimilarPairs] = _compute_dot_product_similarity
         elif similarity_metric == "cosine-similarity":
-            self.compute_similarity: Callable[[dict[str, np.ndarray]], SimilarityDict] = _compute_cosine_similarity
+            self.compute_similarity: Callable[..., SimilarPairs] = _compute_cosine_similarity
         else:
             raise ValueError(f"{similarity_metric}은 유효한 유사도 메트릭이 아닙니다.")
 
         self.threshold = similarity_threshold
+        self.top_k = similarity_top_k
         self.is_save_results = is_save_results
+        self.embedding_store = embedding_store
+        self.history_index = history_index
 
     def run(self, grouped_dict: dict[str, dict[str, Mail]]) -> dict[str, list[str]]:
 
         clustered_dict: dict[str, dict[str, list[str]]] = {}
+        all_embedding_vectors: dict[str, np.ndarray] = {}
         for category, grouped_mail_dict in grouped_dict.items():
-            embedding_vectors = {
-                mail_id: self.embedding_model.process(mail.subject) for mail_id, mail in grouped_mail_dict.items()
-            }
-            similar_dict = self.compute_similarity(embedding_vectors)
+            mail_ids = list(grouped_mail_dict.keys())
+            embedding_vectors = self._embed_mails(grouped_mail_dict)
+            all_embedding_vectors.update(embedding_vectors)
+            embedding_matrix = np.stack([embedding_vectors[mail_id] for mail_id in mail_ids])
+            similar_pairs = self.compute_similarity(embedding_matrix, self.threshold, self.top_k)
 
             if self.is_save_results:
+                # 결과 파일에는 클러스터링에 사용한 쌍(threshold, top_k로 걸러진 쌍)만 기록하여 n² 쌍을 만들지 않음
+                similar_dict = _to_similarity_dict(mail_ids, similar_pairs)
                 self._save_top_match(category, grouped_mail_dict, similar_dict)
                 self._save_similar_emails(category, grouped_mail_dict, similar_dict)
 
             # TODO: prefix를 붙여서 2가지 분류 기준을 구분할 것
-            clustered_dict.update({category: self._process_similar_mails(similar_dict)})
+            clustered_dict.update({category: self._process_similar_mails(mail_ids, similar_pairs)})
 
-        return {
+        similar_mails_dict = {
             mail_id: similar_mail_list
             for similar_mail_dict in clustered_dict.values()
             for mail_id, similar_mail_list in similar_mail_dict.items()
         }
+        if self.history_index is not None and all_embedding_vectors:
+            mail_dict = {
+                mail_id: mail
+                for grouped_mail_dict in grouped_dict.values()
+                for mail_id, mail in grouped_mail_dict.items()
+            }
+            self._link_previous_mails(mail_dict, all_embedding_vectors, similar_mails_dict)
+        return similar_mails_dict
 
     # built-in functions
+    def _embed_mails(self, mail_dict: dict[str, Mail]) -> dict[str, np.ndarray]:
+        texts = {mail.message_id: mail.subject for mail in mail_dict.values()}
+        stored_vectors = self.embedding_store.get_many(texts) if self.embedding_store is not None else {}
+
+        # 저장소에 없는 메일만 한 번에 임베딩
+        missing_texts = {message_id: text for message_id, text in texts.items() if message_id not in stored_vectors}
+        if missing_texts:
+            new_vectors = dict(
+                zip(missing_texts.keys(), self.embedding_model.process_batch(list(missing_texts.values())))
+            )
+            stored_vectors.update(new_vectors)
+            if self.embedding_store is not None:
+                self.embedding_store.add_many(missing_texts, new_vectors)
+                self.embedding_store.compact_if_stale()
+
+        return {mail_id: stored_vectors[mail.message_id] for mail_id, mail in mail_dict.items()}
+
+    def _link_previous_mails(
+        self,
+        mail_dict: dict[str, Mail],
+        embedding_vectors: dict[str, np.ndarray],
+        similar_mails_dict: dict[str, list[str]],
+    ):
+        """
+        이전 실행에서 인덱스에 추가한 메일 중 비슷한 메일을 similar_mails_dict에 연결하고, 이번 메일을 인덱스에 추가합니다.
+        """
+        history_config = Config.config["embedding"]["history"]
+        mail_ids = list(embedding_vectors.keys())
+        message_ids = [mail_dict[mail_id].message_id for mail_id in mail_ids]
+        embedding_matrix = np.stack([embedding_vectors[mail_id] for mail_id in mail_ids])
+
+        current_message_ids = set(message_ids)
+        neighbor_lists = self.history_index.search(
+            embedding_matrix, history_config["top_k"], history_config["similarity_threshold"]
+        )
+        for mail_id, neighbors in zip(mail_ids, neighbor_lists):
+            # 같은 메일을 다시 가져온 경우는 이전 메일로 보지 않음
+            previous_ids = [neighbor_id for neighbor_id, _ in neighbors if neighbor_id not in current_message_ids]
+            similar_mails_dict.setdefault(mail_id, []).extend(previous_ids)
+
+        self.history_index.add(message_ids, embedding_matrix)
+
     def _save_top_match(self, category: str, mail_dict: dict[str, Mail], similar_dict: SimilarityDict):
         filename = f"{self.model_name}_{category}_top_match.txt"
 
@@ -136,9 +194,9 @@ class EmbeddingManager:
             f.write(txt_content)
         print(f"Saved similar emails to {filename}")
 
-    def _process_similar_mails(self, similar_dict: SimilarityDict) -> dict[str, list[str]]:
-        filtered_dict: dict[str, list[str]] = {
-            mail_id: [sim_id for sim_id, sim_score in similar_list if sim_score >= self.threshold]
-            for mail_id, similar_list in similar_dict.items()
-        }
+    def _process_similar_mails(self, mail_ids: list[str], similar_pairs: SimilarPairs) -> dict[str, list[str]]:
+        # similar_pairs는 이미 threshold와 top_k로 걸러진 쌍
+        filtered_dict: dict[str, list[str]] = {mail_id: [] for mail_id in mail_ids}
+        for i, j in zip(similar_pairs.query_indices, similar_pairs.neighbor_indices):
+            filtered_dict[mail_ids[i]].append(mail_ids[j])
         return filtered_dict
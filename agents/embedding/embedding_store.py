@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Optional
+
+import numpy as np
+
+from utils.configuration import Config
+
+
+class EmbeddingStore:
+    """
+    사용자별, 임베딩 모델별 디렉터리에 임베딩 벡터를 저장하는 append-only 저장소입니다.
+    Gmail message_id와 (모델 이름 + 임베딩한 텍스트)의 해시로 벡터를 찾으므로, 텍스트가 바뀐 메일은 다시 임베딩합니다.
+
+    디렉터리 구성:
+        - meta.json: 벡터 차원과 현재 세대(generation) 번호
+        - vectors-{generation}.f32: float32 벡터를 행 단위로 이어 붙인 파일 (np.memmap으로 읽음)
+        - index-{generation}.jsonl: 한 줄에 {"message_id", "content_hash", "row"} 하나
+
+    같은 message_id를 다시 저장하면 새 행을 추가하고 index의 마지막 행을 사용합니다.
+    compact는 유효한 행만 다음 세대 파일에 다시 쓰고 meta.json을 교체하므로, 도중에 중단되어도 이전 세대가 유지됩니다.
+
+    Args:
+        directory (str): 저장소 디렉터리
+        model_name (str): 임베딩 모델 이름. content hash에 포함됩니다.
+    """
+
+    def __init__(self, directory: str, model_name: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.model_name = model_name
+        self._lock = threading.Lock()
+
+        self.dim: Optional[int] = None
+        self.generation = 0
+        self.num_rows = 0
+        self._index: dict[str, tuple[str, int]] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._load()
+
+    @classmethod
+    def for_user(cls, user_id: str, model_name: str, namespace: Optional[str] = None) -> "EmbeddingStore":
+        """
+        config.yml의 embedding.store.path 아래에 사용자와 모델별 저장소를 엽니다.
+        namespace를 지정하면 같은 사용자의 다른 용도 저장소와 분리된 디렉터리를 사용합니다.
+        """
+        safe_model_name = re.sub(r"[^\w.-]", "_", model_name)
+        directory = os.path.join(Config.config["embedding"]["store"]["path"], str(user_id), namespace or "")
+        return cls(os.path.join(directory, safe_model_name), model_name)
+
+    def content_hash(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: dict[str, str]) -> dict[str, np.ndarray]:
+        """
+        Args:
+            texts (dict[str, str]): {message_id: 임베딩할 텍스트}
+
+        Returns:
+            dict[str, np.ndarray]: 저장소에 같은 텍스트로 저장된 벡터가 있는 message_id의 벡터
+        """
+        with self._lock:
+            found = {}
+            for message_id, text in texts.items():
+                entry = self._index.get(message_id)
+                if entry is not None and entry[0] == self.content_hash(text):
+                    found[message_id] = np.array(self._vectors[entry[1]])
+            return found
+
+    def add_many(self, texts: dict[str, str], vectors: dict[str, np.ndarray]):
+        """
+        Args:
+            texts (dict[str, str]): {message_id: 임베딩한 텍스트}
+            vectors (dict[str, np.ndarray]): {message_id: 벡터}
+        """
+        if not vectors:
+            return
+
+        message_ids = list(vectors.keys())
+        matrix = np.stack([vectors[message_id] for message_id in message_ids]).astype(np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                self._write_meta()
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"벡터 차원({matrix.shape[1]})이 저장소의 차원({self.dim})과 다릅니다.")
+
+            # 벡터를 먼저 쓰고 index를 추가하여, 중단되더라도 index가 없는 벡터만 남도록 함
+            with open(self._vectors_path(self.generation), "ab") as file:
+                file.write(matrix.tobytes())
+            entries = []
+            for offset, message_id in enumerate(message_ids):
+                entry = (self.content_hash(texts[message_id]), self.num_rows + offset)
+                self._index[message_id] = entry
+                entries.append({"message_id": message_id, "content_hash": entry[0], "row": entry[1]})
+            with open(self._index_path(self.generation), "a", encoding="utf-8") as file:
+                file.writelines(json.dumps(entry) + "\n" for entry in entries)
+
+            self.num_rows += len(message_ids)
+            self._open_vectors()
+
+    def remove(self, message_ids: list[str]):
+        """
+        message_id의 벡터를 index에서 제거합니다. 파일의 행은 compact할 때 정리됩니다.
+        """
+        with self._lock:
+            removed = [message_id for message_id in message_ids if self._index.pop(message_id, None) is not None]
+            if removed:
+                with open(self._index_path(self.generation), "a", encoding="utf-8") as file:
+                    file.writelines(
+                        json.dumps({"message_id": message_id, "row": None}) + "\n" for message_id in removed
+                    )
+
+    @property
+    def stale_ratio(self) -> float:
+        """
+        파일에 남아 있지만 더 이상 사용하지 않는 행의 비율
+        """
+        return 1 - len(self._index) / self.num_rows if self.num_rows else 0.0
+
+    def compact_if_stale(self):
+        """
+        사용하지 않는 행의 비율이 config.yml의 embedding.store.compact_ratio를 넘으면 compact합니다.
+        """
+        if self.stale_ratio > Config.config["embedding"]["store"]["compact_ratio"]:
+            self.compact()
+
+    def compact(self):
+        """
+        유효한 행만 다음 세대 파일에 다시 쓰고, 이전 세대 파일을 삭제합니다.
+        """
+        with self._lock:
+            if self.dim is None:
+                return
+
+            next_generation = self.generation + 1
+            message_ids = list(self._index.keys())
+            rows = [self._index[message_id][1] for message_id in message_ids]
+            matrix = np.asarray(self._vectors[rows]) if rows else np.empty((0, self.dim), dtype=np.float32)
+            with open(self._vectors_path(next_generation), "wb") as file:
+                file.write(matrix.tobytes())
+            with open(self._index_path(next_generation), "w", encoding="utf-8") as file:
+                file.writelines(
+                    json.dumps({"message_id": message_id, "content_hash": self._index[message_id][0], "row": row})
+                    + "\n"
+                    for row, message_id in enumerate(message_ids)
+                )
+
+            previous_generation = self.generation
+            self.generation = next_generation
+            self._write_meta()
+            self._vectors = None
+            for path in (self._vectors_path(previous_generation), self._index_path(previous_generation)):
+                os.remove(path)
+
+            self._index = {message_id: (self._index[message_id][0], row) for row, message_id in enumerate(message_ids)}
+            self.num_rows = len(message_ids)
+            self._open_vectors()
+
+    # built-in functions
+    def _load(self):
+        meta_path = os.path.join(self.directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return
+
+        with open(meta_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        self.dim = meta["dim"]
+        self.generation = meta["generation"]
+
+        vectors_path = self._vectors_path(self.generation)
+        if os.path.exists(vectors_path):
+            self.num_rows = os.path.getsize(vectors_path) // (4 * self.dim)
+            # 쓰는 도중 중단되어 남은 불완전한 행을 잘라내 이후 추가되는 행의 위치가 어긋나지 않도록 함
+            os.truncate(vectors_path, self.num_rows * 4 * self.dim)
+        if os.path.exists(self._index_path(self.generation)):
+            with open(self._index_path(self.generation), "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 쓰는 도중 중단된 줄은 무시 (해당 행은 다음 실행에서 다시 임베딩)
+                        continue
+                    if entry["row"] is None:
+                        self._index.pop(entry["message_id"], None)
+                    # 벡터 파일에 기록되지 않은 행은 무시
+                    elif entry["row"] < self.num_rows:
+                        self._index[entry["message_id"]] = (entry["content_hash"], entry["row"])
+        self._open_vectors()
+
+    def _open_vectors(self):
+        if self.num_rows == 0:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(
+            self._vectors_path(self.generation), dtype=np.float32, mode="r", shape=(self.num_rows, self.dim)
+        )
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.directory, "meta.json")
+        with open(f"{meta_path}.tmp", "w", encoding="utf-8") as file:
+            json.dump({"dim": self.dim, "generation": self.generation}, file)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def _vectors_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"vectors-{generation}.f32")
+
+    def _index_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"index-{generation}.jsonl")
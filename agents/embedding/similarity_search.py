@@ -0,0 +1,74 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class SimilarPairs(NamedTuple):
+    """
+    유사한 벡터 쌍을 담는 배열들입니다. 같은 길이이며, query 순서대로, 같은 query 안에서는 유사도 내림차순으로 정렬됩니다.
+    """
+
+    query_indices: np.ndarray  # int64
+    neighbor_indices: np.ndarray  # int64
+    scores: np.ndarray  # float32
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norm_matrix = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / (norm_matrix + 1e-10)  # 0으로 나누는 것 방지
+
+
+def search_similar(
+    embedding_matrix: np.ndarray,
+    threshold: float = -np.inf,
+    top_k: Optional[int] = None,
+    normalize: bool = False,
+    block_size: int = 1024,
+) -> SimilarPairs:
+    """
+    모든 벡터 쌍의 내적 중 threshold 이상인 쌍을 찾습니다. 자기 자신과의 쌍은 제외합니다.
+    block_size개의 행씩 float32 행렬곱을 하므로 메모리 사용량은 (block_size, 벡터 개수)에 비례합니다.
+
+    Args:
+        embedding_matrix (np.ndarray): (벡터 개수, 차원) 형태의 행렬
+        threshold (float): 이 값 이상의 유사도를 가진 쌍만 반환합니다.
+        top_k (int, optional): 지정하면 query마다 유사도가 높은 최대 top_k개의 쌍만 반환합니다.
+        normalize (bool): True이면 행을 정규화하여 코사인 유사도를 계산합니다.
+        block_size (int): 한 번에 계산할 query 행 수
+
+    Returns:
+        SimilarPairs: (query 인덱스, 이웃 인덱스, 유사도) 배열
+    """
+    matrix = np.asarray(embedding_matrix, dtype=np.float32)
+    if normalize:
+        matrix = normalize_rows(matrix)
+
+    num_vectors = len(matrix)
+    query_blocks, neighbor_blocks, score_blocks = [], [], []
+    for start in range(0, num_vectors, block_size):
+        similarity_block = matrix[start : start + block_size] @ matrix.T
+        block_rows = np.arange(len(similarity_block))
+        similarity_block[block_rows, start + block_rows] = -np.inf
+
+        mask = similarity_block >= threshold
+        mask[block_rows, start + block_rows] = False
+        if top_k is not None and top_k < num_vectors - 1:
+            # 행마다 상위 top_k개 열만 남김 (정렬 없이 선택)
+            top_mask = np.zeros_like(mask)
+            if top_k > 0:
+                top_columns = np.argpartition(-similarity_block, top_k - 1, axis=1)[:, :top_k]
+                top_mask[block_rows[:, None], top_columns] = True
+            mask &= top_mask
+
+        rows, columns = np.nonzero(mask)
+        query_blocks.append(rows + start)
+        neighbor_blocks.append(columns)
+        score_blocks.append(similarity_block[rows, columns])
+
+    query_indices = np.concatenate(query_blocks) if query_blocks else np.empty(0, dtype=np.int64)
+    neighbor_indices = np.concatenate(neighbor_blocks) if neighbor_blocks else np.empty(0, dtype=np.int64)
+    scores = np.concatenate(score_blocks) if score_blocks else np.empty(0, dtype=np.float32)
+
+    # query 오름차순, 같은 query 안에서는 유사도 내림차순
+    order = np.lexsort((-scores, query_indices))
+    return SimilarPairs(query_indices[order], neighbor_indices[order], scores[order])
@@ -1,13 +1,12 @@
 import numpy as np
-from openai import OpenAI
 
 from agents.embedding.sentence_splitter import split_sentences
-from utils.configuration import Config
+from utils.llm_client import LLMClient
 
 
 class UpstageEmbeddingAgent:
     def __init__(self):
-        self.client = OpenAI(api_key=Config.user_upstage_api_key, base_url="https://api.upstage.ai/v1/solar")
+        self.client = LLMClient.get()
 
     def process(self, summary: str) -> np.ndarray:
         splitted_sentences = split_sentences(summary)
@@ -19,3 +18,9 @@ class UpstageEmbeddingAgent:
         mean_pooled_vector = np.mean(embedding_matrix, axis=0)
 
         return mean_pooled_vector
+
+    def process_batch(self, summaries: list[str]) -> np.ndarray:
+        """
+        Bgem3EmbeddingAgent.process_batch와 같은 형태로 (텍스트 개수, 차원) 행렬을 반환합니다.
+        """
+        return np.array([self.process(summary) for summary in summaries])
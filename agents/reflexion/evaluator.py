@@ -1,19 +1,37 @@
+import json
 import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-from openai import OpenAI
-
+from agents.reflexion.json_formats import GEVAL_SCORE_RANGES, create_geval_format
+from prompt.template_registry import TemplateRegistry
 from utils.configuration import Config
 from utils.decorators import retry_with_exponential_backoff
+from utils.llm_cache import LLMResponseCache
+from utils.llm_client import LLMClient
 from utils.token_usage_counter import TokenUsageCounter
 
 
 class ReflexionEvaluator:
-    def __init__(self):
+    """
+    Reflexion에서 생성한 텍스트를 G-Eval 방식으로 채점합니다.
+
+    Args:
+        mode (str, optional): aspect 채점 방식. None이면 config.yml의 reflexion.g-eval.mode를 사용합니다.
+            - "sequential": aspect마다 순서대로 요청
+            - "parallel": aspect마다 요청하되 동시에 실행
+            - "fused": 한 번의 요청으로 모든 aspect 점수를 JSON으로 받음 (응답 형식이 잘못된 경우 parallel로 대체)
+    """
+
+    def __init__(self, mode: Optional[str] = None):
         self.model_name = "solar-pro"
-        self.client = OpenAI(api_key=Config.user_upstage_api_key, base_url="https://api.upstage.ai/v1/solar")
+        self.client = LLMClient.get()
 
         self.prompt_path: str = Config.config["report"]["g_eval"]["prompt_path"]
         self.aspects = ["consistency", "coherence", "fluency", "relevance"]
+        self.mode = mode or Config.config["reflexion"]["g-eval"]["mode"]
+        if self.mode not in ("sequential", "parallel", "fused"):
+            raise ValueError(f"{self.mode}은 유효한 G-Eval 채점 방식이 아닙니다.")
 
     @retry_with_exponential_backoff()
     def get_geval_scores(self, source_text: str, output_text: str) -> dict:
@@ -26,41 +44,83 @@ class ReflexionEvaluator:
         Returns:
             g_eval_result (dict): g-eval 결과 딕셔너리
         """
-
+        aspect_scores = None
         total_token_usage = 0
+        if self.mode == "fused":
+            aspect_scores, total_token_usage = self._get_fused_scores(source_text, output_text)
 
-        aspect_scores = {}
-        for aspect in self.aspects:
-            cur_prompt = self._create_aspect_prompt(aspect, source_text, output_text)
+        if aspect_scores is None:
 
-            # OpenAI API 호출
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[{"role": "system", "content": cur_prompt}],
-                temperature=0.7,
-                max_tokens=50,
-                n=1,
-            )
+            def score_aspect(aspect: str) -> tuple[float, int]:
+                return self._get_aspect_score(aspect, source_text, output_text)
 
-            try:
-                aspect_scores[aspect] = self._extract_score(response.choices[0].message.content.strip())
-            except Exception as e:
-                print(f"[Error] eval_type=report, aspect={aspect}, error={e}")
-                aspect_scores[aspect] = 0.0
-                continue
+            if self.mode == "sequential":
+                results = [score_aspect(aspect) for aspect in self.aspects]
+            else:
+                with ThreadPoolExecutor(max_workers=len(self.aspects)) as executor:
+                    results = list(executor.map(score_aspect, self.aspects))
 
-            total_token_usage += response.usage.total_tokens
+            aspect_scores = {aspect: score for aspect, (score, _) in zip(self.aspects, results)}
+            total_token_usage += sum(tokens for _, tokens in results)
 
         TokenUsageCounter.add_usage("reflexion", "evaluator", total_token_usage)
 
         return aspect_scores
 
-    def _create_aspect_prompt(self, aspect: str, source_text: str, output_text: str) -> str:
-        with open(f"{self.prompt_path}{aspect}.txt", "r", encoding="utf-8") as f:
-            base_prompt = f.read()
+    def _get_aspect_score(self, aspect: str, source_text: str, output_text: str) -> tuple[float, int]:
+        cur_prompt = self._create_aspect_prompt(aspect, source_text, output_text)
+
+        # OpenAI API 호출
+        response = LLMResponseCache.create(
+            self.client,
+            model=self.model_name,
+            messages=[{"role": "system", "content": cur_prompt}],
+            temperature=0.7,
+            max_tokens=50,
+            n=1,
+        )
+
+        try:
+            return self._extract_score(response.choices[0].message.content.strip()), response.usage.total_tokens
+        except Exception as e:
+            print(f"[Error] eval_type=report, aspect={aspect}, error={e}")
+            return 0.0, response.usage.total_tokens
+
+    def _get_fused_scores(self, source_text: str, output_text: str) -> tuple[Optional[dict], int]:
+        """
+        모든 aspect 점수를 한 번의 요청으로 받습니다. 응답 형식이 잘못된 경우 점수 대신 None을 반환합니다.
+        """
+        cur_prompt = TemplateRegistry.render(
+            "prompt/template/reflexion/g_eval_fused.txt",
+            aspects_description=TemplateRegistry.load(f"{self.prompt_path}aspects_description_final.txt"),
+            score_ranges="\n".join(
+                f"  - {aspect}: {GEVAL_SCORE_RANGES[aspect][0]}-{GEVAL_SCORE_RANGES[aspect][1]}"
+                for aspect in self.aspects
+            ),
+            Document=source_text,
+            Summary=output_text,
+        )
+
+        response = LLMResponseCache.create(
+            self.client,
+            model=self.model_name,
+            messages=[{"role": "system", "content": cur_prompt}],
+            response_format=create_geval_format(self.aspects),
+            temperature=0.7,
+            max_tokens=100,
+            n=1,
+        )
+
+        try:
+            scores = json.loads(response.choices[0].message.content)
+            return {aspect: float(scores[aspect]) for aspect in self.aspects}, response.usage.total_tokens
+        except (TypeError, KeyError, ValueError) as e:
+            print(f"[Error] eval_type=report, mode=fused, error={e}")
+            return None, response.usage.total_tokens
 
+    def _create_aspect_prompt(self, aspect: str, source_text: str, output_text: str) -> str:
         # {Document}, {Summary} 치환
-        return base_prompt.format(Document=source_text, Summary=output_text)
+        return TemplateRegistry.render(f"{self.prompt_path}{aspect}.txt", Document=source_text, Summary=output_text)
 
     def _extract_score(self, gpt_text: str):
         # 정규표현식으로 숫자만 추출, 예: "abc123def" -> numbers = ['1','2','3']
@@ -0,0 +1,28 @@
+# aspect별 점수 범위 (prompt/template/reflexion/g_eval/의 평가 기준과 같아야 함)
+GEVAL_SCORE_RANGES = {"consistency": (1, 5), "coherence": (1, 5), "fluency": (1, 3), "relevance": (1, 5)}
+
+
+def create_geval_format(aspects: list[str]) -> dict:
+    """
+    G-Eval의 여러 aspect 점수를 한 번에 받기 위한 JSON Schema response_format을 생성합니다.
+    각 aspect의 점수는 GEVAL_SCORE_RANGES의 범위로 제한됩니다.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "g_eval_scores",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    aspect: {
+                        "type": "integer",
+                        "enum": list(range(GEVAL_SCORE_RANGES[aspect][0], GEVAL_SCORE_RANGES[aspect][1] + 1)),
+                        "description": f"{aspect} 점수입니다.",
+                    }
+                    for aspect in aspects
+                },
+                "required": aspects,
+            },
+        },
+    }
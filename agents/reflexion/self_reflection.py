@@ -1,7 +1,6 @@
-from openai import OpenAI
-
-from utils.configuration import Config
+from prompt.template_registry import TemplateRegistry
 from utils.decorators import retry_with_exponential_backoff
+from utils.llm_client import LLMClient
 from utils.token_usage_counter import TokenUsageCounter
 
 
@@ -11,13 +10,7 @@ class ReflexionSelfReflection:
         self.temperature = 0.7
         self.seed = 42
         self.reflection_memory: list[str] = []
-        self.client = OpenAI(api_key=Config.user_upstage_api_key, base_url="https://api.upstage.ai/v1/solar")
-        # Reflexion 프롬프트 템플릿을 읽어온다
-        with open("prompt/template/reflexion/reflexion_final.txt", "r", encoding="utf-8") as file:
-            self.reflection_template = file.read()
-        # aspect 별 채점 기준을 읽어온다
-        with open("prompt/template/reflexion/g_eval/aspects_description_final.txt", "r", encoding="utf-8") as file:
-            self.aspects_description = file.read()
+        self.client = LLMClient.get()
 
     @retry_with_exponential_backoff()
     def generate_reflection(self, source_text, output_text, eval_result):
@@ -29,18 +22,21 @@ class ReflexionSelfReflection:
             summary_output (str): 생성된  텍스트
             eval_result (str): 평가 점수
         """
-        formatted_prompt = self.reflection_template.format(
+        # aspect 별 채점 기준과 Reflexion 프롬프트 템플릿 (파일이 수정되면 다시 읽음)
+        aspects_description = TemplateRegistry.load("prompt/template/reflexion/g_eval/aspects_description_final.txt")
+        formatted_prompt = TemplateRegistry.render(
+            "prompt/template/reflexion/reflexion_final.txt",
             source_input=source_text,
             source_output=output_text,
             eval_result=eval_result,
-            eval_aspects_description=self.aspects_description,
+            eval_aspects_description=aspects_description,
             previous_reflections=self.get_reflection_memory_str(),
         )
 
         # 메시지 구성
         messages = [
             {"role": "system", "content": formatted_prompt},
-            {"role": "user", "content": self.aspects_description},
+            {"role": "user", "content": aspects_description},
         ]
 
         # 모델에게 메시지를 전달해 리플렉션 결과 받기
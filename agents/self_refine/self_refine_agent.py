@@ -1,13 +1,15 @@
 import json
 
-from openai import OpenAI
 from openai.types.chat.chat_completion import ChatCompletion
 
 from agents.self_refine.json_formats import FEEDBACK_FORMAT
-from agents.utils.groundness_check import check_groundness
+from agents.utils.groundness_check import check_groundness, check_groundness_async
 from gmail_api.mail import Mail
+from prompt.template_registry import TemplateRegistry
 from utils.configuration import Config
 from utils.decorators import retry_with_exponential_backoff
+from utils.llm_cache import LLMResponseCache
+from utils.llm_client import LLMClient
 from utils.token_usage_counter import TokenUsageCounter
 
 
@@ -27,40 +29,24 @@ class SelfRefineAgent:
         self.model_name = model_name
         self.temperature = temperature
         self.seed = seed
-        self.client = OpenAI(api_key=Config.user_upstage_api_key, base_url="https://api.upstage.ai/v1/solar")
+        self.client = LLMClient.get()
 
     @retry_with_exponential_backoff()
     def feedback(self, mail: Mail, summary: str) -> ChatCompletion:
-        with open("prompt/template/self_refine/feedback_system.txt", "r", encoding="utf-8") as file:
-            system_prompt = file.read().strip()
-        with open("prompt/template/self_refine/feedback_user.txt", "r", encoding="utf-8") as file:
-            user_prompt = file.read().strip().format(mail=str(mail), summary=summary)
-        return self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            response_format=FEEDBACK_FORMAT,
-            temperature=self.temperature,
-            seed=self.seed,
-        )
+        return LLMResponseCache.create(self.client, **self._build_feedback_request(mail, summary))
 
     @retry_with_exponential_backoff()
     def refine(self, mail: Mail, summary: str, feedback: str) -> ChatCompletion:
-        with open("prompt/template/self_refine/refine_system.txt", "r", encoding="utf-8") as file:
-            system_prompt = file.read().strip()
-        with open("prompt/template/self_refine/refine_user.txt", "r", encoding="utf-8") as file:
-            user_prompt = file.read().strip().format(mail=str(mail), summary=summary, feedback=feedback)
-
-        return self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=self.temperature,
-            seed=self.seed,
+        return LLMResponseCache.create(self.client, **self._build_refine_request(mail, summary, feedback))
+
+    @retry_with_exponential_backoff()
+    async def afeedback(self, mail: Mail, summary: str) -> ChatCompletion:
+        return await LLMResponseCache.acreate(LLMClient.get_async(), **self._build_feedback_request(mail, summary))
+
+    @retry_with_exponential_backoff()
+    async def arefine(self, mail: Mail, summary: str, feedback: str) -> ChatCompletion:
+        return await LLMResponseCache.acreate(
+            LLMClient.get_async(), **self._build_refine_request(mail, summary, feedback)
         )
 
     @retry_with_exponential_backoff()
@@ -78,24 +64,85 @@ class SelfRefineAgent:
         max_iteration = Config.config["self_refine"]["max_iteration"]
 
         for i in range(max_iteration):
-            groundness = check_groundness(
-                str(mail),
-                summary,
-                self.__class__.__name__,
-            )
-            print(f"Self-refine {i + 1} 회차")
+            groundness = check_groundness(str(mail), summary, self.__class__.__name__)
+            print(f"[{mail.id}] Self-refine {i + 1} 회차")
+
+            feedback = self._parse_feedback(self.feedback(mail, summary))
+            if self._is_finished(feedback, groundness):
+                print(f"[{mail.id}] Self-refine {i + 1} 회차에서 종료")
+                break
+
+            summary = self._parse_refine(self.refine(mail, summary, feedback["issues"]))
+
+        return summary
+
+    @retry_with_exponential_backoff()
+    async def aprocess(self, mail: Mail, summary: str):
+        """
+        process의 비동기 버전입니다. 여러 메일을 동시에 Self-refine 할 때 사용합니다.
+        요청 생성과 응답 해석은 process와 같은 helper를 사용하며, API 호출만 비동기로 합니다.
 
-            feedback_response: ChatCompletion = self.feedback(mail, summary)
-            TokenUsageCounter.add_usage(self.__class__.__name__, "feedback", feedback_response.usage.total_tokens)
+        Return:
+            str: Self-refine을 거친 최종 결과물.
+        """
+        max_iteration = Config.config["self_refine"]["max_iteration"]
 
-            feedback = json.loads(feedback_response.choices[0].message.content)
+        for i in range(max_iteration):
+            groundness = await check_groundness_async(str(mail), summary, self.__class__.__name__)
+            print(f"[{mail.id}] Self-refine {i + 1} 회차")
 
-            if feedback["evaluation"] == "STOP" and len(feedback["issues"]) == 0 and groundness == "grounded":
-                print(f"Self-refine {i + 1} 회차에서 종료")
+            feedback = self._parse_feedback(await self.afeedback(mail, summary))
+            if self._is_finished(feedback, groundness):
+                print(f"[{mail.id}] Self-refine {i + 1} 회차에서 종료")
                 break
 
-            revision_response: ChatCompletion = self.refine(mail, summary, feedback["issues"])
-            summary = revision_response.choices[0].message.content
-            TokenUsageCounter.add_usage(self.__class__.__name__, "refine", revision_response.usage.total_tokens)
+            summary = self._parse_refine(await self.arefine(mail, summary, feedback["issues"]))
 
         return summary
+
+    def _build_feedback_request(self, mail: Mail, summary: str) -> dict:
+        system_prompt = TemplateRegistry.load("prompt/template/self_refine/feedback_system.txt", strip=True)
+        user_prompt = TemplateRegistry.render(
+            "prompt/template/self_refine/feedback_user.txt", strip=True, mail=str(mail), summary=summary
+        )
+        return {
+            "model": self.model_name,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "response_format": FEEDBACK_FORMAT,
+            "temperature": self.temperature,
+            "seed": self.seed,
+        }
+
+    def _build_refine_request(self, mail: Mail, summary: str, feedback: str) -> dict:
+        system_prompt = TemplateRegistry.load("prompt/template/self_refine/refine_system.txt", strip=True)
+        user_prompt = TemplateRegistry.render(
+            "prompt/template/self_refine/refine_user.txt",
+            strip=True,
+            mail=str(mail),
+            summary=summary,
+            feedback=feedback,
+        )
+        return {
+            "model": self.model_name,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": self.temperature,
+            "seed": self.seed,
+        }
+
+    def _parse_feedback(self, feedback_response: ChatCompletion) -> dict:
+        TokenUsageCounter.add_usage(self.__class__.__name__, "feedback", feedback_response.usage.total_tokens)
+        return json.loads(feedback_response.choices[0].message.content)
+
+    def _parse_refine(self, revision_response: ChatCompletion) -> str:
+        TokenUsageCounter.add_usage(self.__class__.__name__, "refine", revision_response.usage.total_tokens)
+        return revision_response.choices[0].message.content
+
+    @staticmethod
+    def _is_finished(feedback: dict, groundness: str) -> bool:
+        return feedback["evaluation"] == "STOP" and len(feedback["issues"]) == 0 and groundness == "grounded"
@@ -1,9 +1,11 @@
-from openai import OpenAI
+from openai.types.chat.chat_completion import ChatCompletion
 
-from agents.utils.groundness_check import check_groundness
+from agents.utils.groundness_check import check_groundness, check_groundness_async
 from agents.utils.utils import build_messages
-from utils.configuration import Config
+from prompt.template_registry import TemplateRegistry
 from utils.decorators import retry_with_exponential_backoff
+from utils.llm_cache import LLMResponseCache
+from utils.llm_client import LLMClient
 from utils.token_usage_counter import TokenUsageCounter
 
 
@@ -32,17 +34,18 @@ class SummaryAgent:
         self.summary_type = summary_type
         self.temperature = temperature
         self.seed = seed
-        self.client = OpenAI(api_key=Config.user_upstage_api_key, base_url="https://api.upstage.ai/v1/solar")
+        self.client = LLMClient.get()
 
     def process_with_reflection(self, mail: str, reflections: list = [], max_iteration: int = 3) -> str:
         input_reflections = "제공된 피드백 없음" if reflections else "\n".join(reflections)
 
-        with open("prompt/template/reflexion/single_reflexion_system.txt", "r", encoding="utf-8") as file:
-            system_prompt = file.read().strip()
-        with open("prompt/template/reflexion/single_reflexion_user.txt", "r", encoding="utf-8") as file:
-            user_prompt = file.read().strip()
-
-        user_prompt = user_prompt.format(mail=mail, previous_reflections=input_reflections)
+        system_prompt = TemplateRegistry.load("prompt/template/reflexion/single_reflexion_system.txt", strip=True)
+        user_prompt = TemplateRegistry.render(
+            "prompt/template/reflexion/single_reflexion_user.txt",
+            strip=True,
+            mail=mail,
+            previous_reflections=input_reflections,
+        )
 
         messages = [
             {"role": "system", "content": system_prompt},
@@ -53,34 +56,57 @@ class SummaryAgent:
         return self._generate_with_groundedness(mail, messages, max_iteration)
 
     def process(self, mail: str, max_iteration: int = 3) -> str:
-        messages = build_messages(template_type="summary", target_range=self.summary_type, action="summary", mail=mail)
+        return self._generate_with_groundedness(mail, self._build_summary_messages(mail), max_iteration)
 
-        return self._generate_with_groundedness(mail, messages, max_iteration)
+    async def aprocess(self, mail: str, max_iteration: int = 3) -> str:
+        """
+        process의 비동기 버전입니다. 여러 메일을 동시에 요약할 때 사용합니다.
+        """
+        return await self._agenerate_with_groundedness(mail, self._build_summary_messages(mail), max_iteration)
 
     @retry_with_exponential_backoff()
     def _generate_with_groundedness(self, mail: str, messages: list[dict], max_iteration: int):
+        request = self._build_summary_request(messages)
         for i in range(max_iteration):
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                # ./prompt/template/summary/{self.summary_type}_summary_system(혹은 user).txt 템플릿에서 프롬프트 생성
-                messages=messages,
-                temperature=self.temperature,
-                seed=self.seed,
-            )
-
-            TokenUsageCounter.add_usage(
-                self.__class__.__name__, f"{self.summary_type}_summary", response.usage.total_tokens
-            )
+            # 매번 같은 요청이므로 다시 생성할 때는 캐시된 응답을 사용하지 않음
+            summary = self._parse_summary(LLMResponseCache.create(self.client, use_cache=(i == 0), **request))
 
             # Groundness Check
-            groundness = check_groundness(
-                mail,
-                response.choices[0].message.content,
-                self.__class__.__name__,
-            )
+            groundness = check_groundness(mail, summary, self.__class__.__name__)
+            print(f"{i + 1}번째 사실 확인: {groundness}")
+            if groundness == "grounded":
+                break
+            # 사실 확인에 실패한 요약은 이후 실행에서 재사용하지 않음
+            LLMResponseCache.invalidate(self.client, **request)
 
+        return summary
+
+    @retry_with_exponential_backoff()
+    async def _agenerate_with_groundedness(self, mail: str, messages: list[dict], max_iteration: int):
+        # 요청 생성과 응답 해석은 _generate_with_groundedness와 같은 helper를 사용하며, API 호출만 비동기로 함
+        client = LLMClient.get_async()
+        request = self._build_summary_request(messages)
+        for i in range(max_iteration):
+            summary = self._parse_summary(await LLMResponseCache.acreate(client, use_cache=(i == 0), **request))
+
+            # Groundness Check
+            groundness = await check_groundness_async(mail, summary, self.__class__.__name__)
             print(f"{i + 1}번째 사실 확인: {groundness}")
             if groundness == "grounded":
                 break
+            LLMResponseCache.invalidate(client, **request)
+
+        return summary
+
+    def _build_summary_messages(self, mail: str) -> list[dict]:
+        # ./prompt/template/summary/{self.summary_type}_summary_system(혹은 user).txt 템플릿에서 프롬프트 생성
+        return build_messages(template_type="summary", target_range=self.summary_type, action="summary", mail=mail)
+
+    def _build_summary_request(self, messages: list[dict]) -> dict:
+        return {"model": self.model_name, "messages": messages, "temperature": self.temperature, "seed": self.seed}
 
+    def _parse_summary(self, response: ChatCompletion) -> str:
+        TokenUsageCounter.add_usage(
+            self.__class__.__name__, f"{self.summary_type}_summary", response.usage.total_tokens
+        )
         return response.choices[0].message.content
@@ -1,22 +1,112 @@
-from openai import OpenAI
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from openai.types.chat.chat_completion import ChatCompletion
 
 from utils.configuration import Config
+from utils.llm_cache import LLMResponseCache
+from utils.llm_client import LLMClient
+from utils.sqlite_cache import SQLiteCache
 from utils.token_usage_counter import TokenUsageCounter
 
 
+class GroundnessMemo:
+    """
+    (context, answer) 쌍의 Groundedness Check 결과를 기억하여 같은 쌍은 다시 요청하지 않도록 합니다.
+    키는 context와 answer의 SHA-256 해시로 만들며, 최근 사용한 결과를 groundness_check.memo_size개까지 메모리에 보관합니다.
+    groundness_check.persistent가 true이면 SQLite 파일에도 저장하여 실행 간에 재사용합니다.
+    """
+
+    _entries: OrderedDict[str, str] = OrderedDict()
+    _persistent_cache: Optional[SQLiteCache] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def build_key(context: str, answer: str) -> str:
+        context_hash = hashlib.sha256(context.encode("utf-8")).hexdigest()
+        answer_hash = hashlib.sha256(answer.encode("utf-8")).hexdigest()
+        return f"{context_hash}:{answer_hash}"
+
+    @classmethod
+    def get(cls, key: str) -> Optional[str]:
+        with cls._lock:
+            groundness = cls._entries.get(key)
+            if groundness is not None:
+                cls._entries.move_to_end(key)
+
+        if groundness is None and cls._get_persistent_cache() is not None:
+            groundness = cls._get_persistent_cache().get(key)
+            if groundness is not None:
+                cls._remember(key, groundness)
+
+        TokenUsageCounter.add_cache_lookup("groundness_check", groundness is not None)
+        return groundness
+
+    @classmethod
+    def set(cls, key: str, groundness: str):
+        cls._remember(key, groundness)
+        if cls._get_persistent_cache() is not None:
+            cls._get_persistent_cache().set(key, groundness)
+
+    @classmethod
+    def _remember(cls, key: str, groundness: str):
+        with cls._lock:
+            cls._entries[key] = groundness
+            cls._entries.move_to_end(key)
+            while len(cls._entries) > Config.config["groundness_check"]["memo_size"]:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def _get_persistent_cache(cls) -> Optional[SQLiteCache]:
+        memo_config = Config.config["groundness_check"]
+        if not memo_config["persistent"]:
+            return None
+
+        with cls._lock:
+            if cls._persistent_cache is None:
+                cls._persistent_cache = SQLiteCache(
+                    memo_config["path"], max_bytes=memo_config["max_size_mb"] * 1024 * 1024
+                )
+        return cls._persistent_cache
+
+
 def check_groundness(context: str, answer: str, agent_name: str = "") -> str:
-    client = OpenAI(api_key=Config.user_upstage_api_key, base_url="https://api.upstage.ai/v1/solar")
-    response = client.chat.completions.create(
-        model="groundedness-check",
-        messages=[
+    memo_key = GroundnessMemo.build_key(context, answer)
+    groundness = GroundnessMemo.get(memo_key)
+    if groundness is not None:
+        return groundness
+
+    response = LLMResponseCache.create(LLMClient.get(), **_build_groundness_request(context, answer))
+    return _record_groundness(memo_key, response, agent_name)
+
+
+async def check_groundness_async(context: str, answer: str, agent_name: str = "") -> str:
+    memo_key = GroundnessMemo.build_key(context, answer)
+    groundness = GroundnessMemo.get(memo_key)
+    if groundness is not None:
+        return groundness
+
+    response = await LLMResponseCache.acreate(LLMClient.get_async(), **_build_groundness_request(context, answer))
+    return _record_groundness(memo_key, response, agent_name)
+
+
+def _build_groundness_request(context: str, answer: str) -> dict:
+    return {
+        "model": "groundedness-check",
+        "messages": [
             {
                 "role": "user",
                 "content": context,
             },
             {"role": "assistant", "content": answer},
         ],
-    )
+    }
+
 
+def _record_groundness(memo_key: str, response: ChatCompletion, agent_name: str) -> str:
     groundness = response.choices[0].message.content
     TokenUsageCounter.add_usage(agent_name, "groundness_check", response.usage.total_tokens)
+    GroundnessMemo.set(memo_key, groundness)
     return groundness
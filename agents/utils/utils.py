@@ -1,6 +1,7 @@
 import yaml
 
 from prompt.prompt import load_template, load_template_with_variables
+from prompt.template_registry import TemplateRegistry
 
 
 # YAML 파일에서 카테고리 정보 로드
@@ -21,13 +22,13 @@ def load_categories_from_yaml(classification_type: str, is_prompt: bool = False)
     """
     yaml_file_path = f"prompt/template/classification/{classification_type}.yaml"
     try:
-        with open(yaml_file_path, "r", encoding="utf-8") as file:
-            categories: dict = yaml.safe_load(file)
+        # 파싱 결과는 TemplateRegistry에 캐시되며 파일이 수정된 경우에만 다시 파싱
+        categories: list[dict] = TemplateRegistry.load_yaml(yaml_file_path)
 
-            if is_prompt:
-                return [{"name": category["name"], "rubric": category["rubric"]} for category in categories]
-            else:
-                return [{"name": category["name"], "description": category["description"]} for category in categories]
+        if is_prompt:
+            return [{"name": category["name"], "rubric": category["rubric"]} for category in categories]
+        else:
+            return [{"name": category["name"], "description": category["description"]} for category in categories]
     except FileNotFoundError:
         raise FileNotFoundError(f"카테고리 파일 {yaml_file_path}이(가) 존재하지 않습니다.")
     except yaml.YAMLError as e:
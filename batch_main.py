@@ -1,15 +1,22 @@
 from dotenv import load_dotenv
 
+from agents.embedding.bge_m3_embedding import Bgem3EmbeddingAgent
 from gmail_api.gmail_service import GmailService
 from pipelines.pipeline import pipeline
+from prompt.template_registry import TemplateRegistry
 from utils.configuration import Config
-from utils.db_utils import authenticate_gmail, fetch_users, insert_report
+from utils.db_utils import authenticate_gmail, fetch_history_id, fetch_users, insert_report, update_history_id
 from utils.token_usage_counter import TokenUsageCounter
 
 
 def main():
     load_dotenv()
     Config.load()
+    # 프롬프트 템플릿을 미리 읽고 placeholder를 검증하여 잘못된 템플릿은 LLM 호출 전에 발견
+    TemplateRegistry.preload()
+    # 임베딩 모델은 프로세스에서 한 번만 로드되어 모든 사용자가 공유
+    if Config.config["embedding"]["model_name"] == "bge-m3" and Config.config["embedding"]["warm_up"]:
+        Bgem3EmbeddingAgent.warm_up()
 
     # 유저 테이블 불러오기
     users = fetch_users()
@@ -22,8 +29,11 @@ def main():
 
             service = authenticate_gmail(user)
             Config.user_upstage_api_key = user["upstage_api_key"]
+            Config.user_id = str(user["id"])
+            # 증분 동기화 시 이전 실행에서 기록한 historyId 이후의 메일만 가져옴
+            start_history_id = fetch_history_id(user["id"]) if Config.config["gmail"]["incremental_sync"] else None
             # GmailService 인스턴스 생성
-            gmail_service = GmailService(service)
+            gmail_service = GmailService(service, start_history_id)
 
             json_checklist, report = pipeline(gmail_service)
             print(f"============ FINAL REPORT of {user['id']} =============")
@@ -35,6 +45,9 @@ def main():
 
             insert_report(user["id"], report, json_checklist)
 
+            if Config.config["gmail"]["incremental_sync"] and gmail_service.last_history_id:
+                update_history_id(user["id"], gmail_service.last_history_id)
+
         except Exception as e:
             print(e)
 
@@ -0,0 +1,77 @@
+"""
+IVFIndex의 근사 검색과 전체 비교(exact search)의 recall@k와 질의 지연 시간을 비교하는 벤치마크입니다.
+메일 임베딩처럼 주제별로 모여 있는 합성 벡터를 사용하며, --store-dir를 지정하면 EmbeddingStore에 저장된 실제 벡터를 사용합니다.
+
+사용 예:
+    python -m benchmark.ann_benchmark --size 20000 --dim 1024 --queries 200 --k 10 --n-probes 1 4 8 16
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from agents.embedding.ann_index import IVFIndex
+
+
+def make_vectors(size: int, dim: int, n_topics: int, noise: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    vectors = topics[rng.integers(n_topics, size=size)] + noise * rng.normal(size=(size, dim)).astype(np.float32)
+    return vectors
+
+
+def load_store_vectors(store_dir: str) -> np.ndarray:
+    with open(os.path.join(store_dir, "meta.json"), "r", encoding="utf-8") as file:
+        meta = json.load(file)
+    return np.fromfile(os.path.join(store_dir, f"vectors-{meta['generation']}.f32"), dtype=np.float32).reshape(
+        -1, meta["dim"]
+    )
+
+
+def measure(index: IVFIndex, queries: np.ndarray, k: int, exact: bool) -> tuple[list[list[str]], float]:
+    start_time = time.perf_counter()
+    results = index.search(queries, k, exact=exact)
+    elapsed = time.perf_counter() - start_time
+    return [[neighbor_id for neighbor_id, _ in neighbors] for neighbors in results], elapsed / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVFIndex recall/지연 시간 벤치마크")
+    parser.add_argument("--size", type=int, default=20000, help="인덱스에 넣을 벡터 수 (합성 데이터)")
+    parser.add_argument("--dim", type=int, default=1024, help="벡터 차원 (합성 데이터)")
+    parser.add_argument("--topics", type=int, default=500, help="합성 데이터의 주제 수")
+    parser.add_argument("--noise", type=float, default=1.0, help="합성 데이터의 주제별 잡음 크기")
+    parser.add_argument("--store-dir", type=str, default=None, help="EmbeddingStore 디렉터리 (지정하면 실제 벡터 사용)")
+    parser.add_argument("--queries", type=int, default=200, help="질의 수 (인덱스에서 제외한 벡터)")
+    parser.add_argument("--k", type=int, default=10, help="recall@k의 k")
+    parser.add_argument("--n-probes", type=int, nargs="+", default=[1, 4, 8, 16], help="측정할 n_probe 값")
+    args = parser.parse_args()
+
+    if args.store_dir:
+        vectors = load_store_vectors(args.store_dir)
+    else:
+        vectors = make_vectors(args.size + args.queries, args.dim, args.topics, args.noise)
+    queries, vectors = vectors[: args.queries], vectors[args.queries :]
+
+    index = IVFIndex(min_train_size=1)
+    start_time = time.perf_counter()
+    index.add([str(i) for i in range(len(vectors))], vectors)
+    print(f"build: {time.perf_counter() - start_time:.2f}s ({len(vectors)} vectors, {len(index.centroids)} lists)")
+
+    exact_results, exact_latency = measure(index, queries, args.k, exact=True)
+    print(f"{'n_probe':>8} {'recall@k':>9} {'ms/query':>9} {'speedup':>8}")
+    print(f"{'exact':>8} {1.0:>9.3f} {exact_latency * 1000:>9.2f} {1.0:>7.1f}x")
+    for n_probe in args.n_probes:
+        index.n_probe = n_probe
+        ann_results, ann_latency = measure(index, queries, args.k, exact=False)
+        recall = np.mean(
+            [len(set(ann) & set(exact)) / len(exact) for ann, exact in zip(ann_results, exact_results) if exact]
+        )
+        print(f"{n_probe:>8} {recall:>9.3f} {ann_latency * 1000:>9.2f} {exact_latency / ann_latency:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Bgem3EmbeddingAgent의 메일별 임베딩(process)과 배치 임베딩(process_batch)의 처리 시간과 벡터 차이를 비교하는 벤치마크입니다.
+evaluation/data/reference.csv의 메일 본문을 반복해서 원하는 메일 수를 만듭니다.
+
+사용 예:
+    python -m benchmark.embedding_benchmark --sizes 50 500 5000 --column body
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from agents.embedding.bge_m3_embedding import Bgem3EmbeddingAgent
+from utils.configuration import Config
+
+DATA_PATH = "evaluation/data/reference.csv"
+
+
+def load_texts(column: str, size: int) -> list[str]:
+    texts = pd.read_csv(DATA_PATH, encoding="utf-8-sig")[column].dropna().astype(str).tolist()
+    return [texts[i % len(texts)] for i in range(size)]
+
+
+def run_benchmark(agent: Bgem3EmbeddingAgent, texts: list[str], batch_size: int) -> dict[str, float]:
+    start_time = time.perf_counter()
+    single_vectors = np.array([agent.process(text) for text in texts])
+    single_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    batch_vectors = agent.process_batch(texts, batch_size=batch_size)
+    batch_time = time.perf_counter() - start_time
+
+    return {
+        "single": single_time,
+        "batch": batch_time,
+        "max_diff": float(np.abs(single_vectors - batch_vectors).max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bge-m3 메일별/배치 임베딩 처리 시간 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000], help="측정할 메일 수")
+    parser.add_argument("--column", type=str, default="body", help="임베딩할 컬럼 (subject | body)")
+    parser.add_argument("--batch-size", type=int, default=32, help="process_batch의 encode 배치 크기")
+    args = parser.parse_args()
+
+    Config.load()
+    # 모델 로드와 첫 호출의 초기화 비용이 측정에 섞이지 않도록 미리 한 번 실행
+    Bgem3EmbeddingAgent.warm_up()
+    agent = Bgem3EmbeddingAgent()
+
+    print(f"{'mails':>6} {'single(s)':>10} {'batch(s)':>9} {'speedup':>8} {'max|diff|':>10}")
+    for size in args.sizes:
+        result = run_benchmark(agent, load_texts(args.column, size), args.batch_size)
+        print(
+            f"{size:>6} {result['single']:>10.2f} {result['batch']:>9.2f} "
+            f"{result['single'] / result['batch']:>7.1f}x {result['max_diff']:>10.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+ReflexionEvaluator의 G-Eval 채점 방식(sequential / parallel / fused)별 지연 시간과 점수 일치도를 비교하는 벤치마크입니다.
+실제 Upstage API를 호출하므로 .env에 UPSTAGE_API_KEY가 필요합니다.
+
+사용 예:
+    python -m benchmark.geval_benchmark --source-file summaries.txt --report-file report.txt --repeat 5
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+from agents.reflexion.evaluator import ReflexionEvaluator
+from prompt.template_registry import TemplateRegistry
+from utils.configuration import Config
+
+MODES = ["sequential", "parallel", "fused"]
+
+
+def run_benchmark(source_text: str, report_text: str, repeat: int) -> dict[str, dict]:
+    results = {}
+    for mode in MODES:
+        evaluator = ReflexionEvaluator(mode)
+        latencies, scores = [], []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            aspect_scores = evaluator.get_geval_scores(source_text, report_text)
+            latencies.append(time.perf_counter() - start_time)
+            scores.append([aspect_scores[aspect] for aspect in evaluator.aspects])
+
+        results[mode] = {"aspects": evaluator.aspects, "latencies": np.array(latencies), "scores": np.array(scores)}
+    return results
+
+
+def print_results(results: dict[str, dict]):
+    aspects = results[MODES[0]]["aspects"]
+    print(f"{'mode':>10} {'mean(s)':>8} {'p95(s)':>8} " + " ".join(f"{aspect:>11}" for aspect in aspects))
+    for mode, result in results.items():
+        mean_scores = result["scores"].mean(axis=0)
+        print(
+            f"{mode:>10} {result['latencies'].mean():>8.2f} {np.percentile(result['latencies'], 95):>8.2f} "
+            + " ".join(f"{score:>11.2f}" for score in mean_scores)
+        )
+
+    # sequential 채점 결과를 기준으로 각 방식의 점수 일치도를 계산 (반복 회차끼리 비교)
+    baseline = results["sequential"]["scores"]
+    print(f"\n{'mode':>10} {'MAE':>6} {'exact':>6}  (vs sequential)")
+    for mode in MODES[1:]:
+        difference = np.abs(results[mode]["scores"] - baseline)
+        print(f"{mode:>10} {difference.mean():>6.2f} {(difference == 0).mean():>6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="G-Eval 채점 방식별 지연 시간/점수 일치도 벤치마크")
+    parser.add_argument("--source-file", type=str, required=True, help="리포트 생성에 사용한 메일 요약문 텍스트 파일")
+    parser.add_argument("--report-file", type=str, required=True, help="채점할 리포트 텍스트 파일")
+    parser.add_argument("--repeat", type=int, default=5, help="방식별 반복 횟수")
+    args = parser.parse_args()
+
+    load_dotenv()
+    Config.load()
+    Config.user_upstage_api_key = os.getenv("UPSTAGE_API_KEY")
+    # 캐시된 응답이 지연 시간 측정에 섞이지 않도록 응답 캐시를 끔
+    Config.config["llm_cache"]["enabled"] = False
+    TemplateRegistry.preload()
+
+    with open(args.source_file, "r", encoding="utf-8") as file:
+        source_text = file.read()
+    with open(args.report_file, "r", encoding="utf-8") as file:
+        report_text = file.read()
+
+    print_results(run_benchmark(source_text, report_text, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+FakeGmailService로 GmailService.fetch_mails의 처리량(mails/second)을 측정하는 벤치마크입니다.
+
+사용 예:
+    python -m benchmark.gmail_fetch_benchmark --latency 0.05 --error-rate 0.01
+    python -m benchmark.gmail_fetch_benchmark --replay recorded_mailbox.json
+"""
+
+import argparse
+import time
+
+from gmail_api.fake_gmail_service import FakeGmailService
+from gmail_api.gmail_service import GmailService
+from utils.configuration import Config
+
+MAIL_COUNTS = [10, 100, 1000]
+
+
+def run_benchmark(fake_service: FakeGmailService, n: int) -> dict:
+    Config.config["gmail"]["max_mails"] = n
+
+    start_time = time.perf_counter()
+    mail_count = sum(1 for _ in GmailService(fake_service).fetch_mails())
+    elapsed_time = time.perf_counter() - start_time
+
+    return {
+        "n": n,
+        "fetched": mail_count,
+        "requests": fake_service.request_count,
+        "seconds": elapsed_time,
+        "mails_per_second": mail_count / elapsed_time if elapsed_time > 0 else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GmailService.fetch_mails 처리량 벤치마크")
+    parser.add_argument("--latency", type=float, default=0.02, help="HTTP 왕복 한 번의 지연 시간(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="개별 요청의 실패 확률")
+    parser.add_argument("--batch-size", type=int, default=None, help="gmail.batch_size 설정 덮어쓰기")
+    parser.add_argument("--attachments", type=int, default=1, help="합성 메일 하나의 첨부파일 수")
+    parser.add_argument("--replay", type=str, default=None, help="record_mailbox로 기록한 JSON 파일 경로")
+    args = parser.parse_args()
+
+    Config.load()
+    if args.batch_size is not None:
+        Config.config["gmail"]["batch_size"] = args.batch_size
+    # 증분 동기화 없이 전체 목록을 가져오는 경우를 측정
+    Config.config["gmail"]["incremental_sync"] = False
+
+    print(f"{'n':>6} {'fetched':>8} {'requests':>9} {'seconds':>9} {'mails/s':>9}")
+    for n in MAIL_COUNTS:
+        if args.replay:
+            fake_service = FakeGmailService.from_file(args.replay, latency=args.latency, error_rate=args.error_rate)
+        else:
+            fake_service = FakeGmailService.synthetic(
+                n, attachments_per_mail=args.attachments, latency=args.latency, error_rate=args.error_rate
+            )
+        result = run_benchmark(fake_service, n)
+        print(
+            f"{result['n']:>6} {result['fetched']:>8} {result['requests']:>9} "
+            f"{result['seconds']:>9.2f} {result['mails_per_second']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
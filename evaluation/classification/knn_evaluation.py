@@ -0,0 +1,48 @@
+import argparse
+
+import pandas as pd
+
+from agents.classification.knn_classifier import KNNClassifier
+from agents.embedding.bge_m3_embedding import Bgem3EmbeddingAgent
+from evaluation.classification.metric_calculator import MetricCalculator
+from utils.configuration import Config
+
+
+def evaluate_knn_classifier(thresholds: list[float]) -> pd.DataFrame:
+    """
+    라벨 데이터(classification.knn.examples_path)에 대해 leave-one-out 방식으로 kNN 분류기를 평가합니다.
+    threshold마다 응답률과, 답한 메일에 대한 카테고리/처리 필요 여부 정확도를 계산합니다.
+    """
+    # user_id 없이 만들어 사용자별 누적 기록은 평가에서 제외
+    classifier = KNNClassifier.from_config(Bgem3EmbeddingAgent(), Config.config["classification"]["knn"])
+
+    results = []
+    for threshold in thresholds:
+        classifier.threshold = threshold
+        predictions = classifier.predict_leave_one_out()
+
+        category_predictions = [labels[0] if labels else None for labels in predictions]
+        action_predictions = [labels[1] if labels else None for labels in predictions]
+        answer_rate, category_accuracy = MetricCalculator.compute_answer_metrics(
+            category_predictions, classifier.categories
+        )
+        _, action_accuracy = MetricCalculator.compute_answer_metrics(action_predictions, classifier.actions)
+        results.append([threshold, answer_rate, category_accuracy, action_accuracy])
+
+    return pd.DataFrame(results, columns=["Threshold", "Answer Rate", "Category Accuracy", "Action Accuracy"])
+
+
+if __name__ == "__main__":
+    Config.load()
+
+    parser = argparse.ArgumentParser(description="kNN 분류기의 응답률과 정확도를 평가합니다.")
+    parser.add_argument(
+        "--thresholds",
+        type=float,
+        nargs="+",
+        default=[Config.config["classification"]["knn"]["threshold"]],
+        help="평가할 신뢰도 threshold 목록",
+    )
+    args = parser.parse_args()
+
+    print(evaluate_knn_classifier(args.thresholds).to_string(index=False))
@@ -179,6 +179,19 @@ class MetricCalculator:
         summary_df = pd.DataFrame(grouped_results, columns=columns)
         return summary_df
 
+    @staticmethod
+    def compute_answer_metrics(predictions: list, ground_truths: list) -> tuple[float, float]:
+        """
+        확신이 없을 때 답하지 않는 분류기(예: kNN 분류기)의 지표 계산.
+        - predictions의 None은 분류기가 답하지 않은(LLM으로 넘긴) 경우
+        - 응답률 = 답한 메일 수 / 전체 메일 수
+        - 정확도 = 답한 메일 중 ground_truth와 일치하는 비율
+        """
+        answered = [(pred, gt) for pred, gt in zip(predictions, ground_truths) if pred is not None]
+        answer_rate = len(answered) / len(predictions) if predictions else 0
+        accuracy = sum(pred == gt for pred, gt in answered) / len(answered) if answered else 0
+        return answer_rate, accuracy
+
     @staticmethod
     def compute_overall_multiclass_confusion_matrix(eval_df: pd.DataFrame, inference_count: int):
         """
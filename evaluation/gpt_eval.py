@@ -1,9 +1,10 @@
 import re
 
-from openai import OpenAI
-
+from prompt.template_registry import TemplateRegistry
 from utils.configuration import Config
 from utils.decorators import retry_with_exponential_backoff
+from utils.llm_cache import LLMResponseCache
+from utils.llm_client import LLMClient
 from utils.token_usage_counter import TokenUsageCounter
 
 
@@ -19,9 +20,9 @@ def calculate_g_eval(source_texts: list[str], generated_texts: list[str], eval_t
     prompt_files: str = Config.config[eval_type]["g_eval"]["prompt_path"]
 
     if model_name == "solar-pro":
-        client = OpenAI(api_key=Config.user_upstage_api_key, base_url="https://api.upstage.ai/v1/solar")
+        client = LLMClient.get()
     else:
-        client = OpenAI()
+        client = LLMClient.get(base_url=None)
 
     print(f"{'='*30}\ng-eval start with **{model_name}**\n")
 
@@ -40,14 +41,12 @@ def calculate_g_eval(source_texts: list[str], generated_texts: list[str], eval_t
                 continue
 
             try:
-                with open(prompt_path, "r", encoding="utf-8") as f:
-                    base_prompt = f.read()
-
                 # {Document}, {Summary} 치환
-                cur_prompt = base_prompt.format(Document=src, Summary=gen)
+                cur_prompt = TemplateRegistry.render(prompt_path, Document=src, Summary=gen)
 
                 # OpenAI API 호출
-                response = client.chat.completions.create(
+                response = LLMResponseCache.create(
+                    client,
                     model=model_name,
                     messages=[{"role": "system", "content": cur_prompt}],
                     temperature=0.7,
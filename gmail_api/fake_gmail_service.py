@@ -0,0 +1,361 @@
+import base64
+import copy
+import json
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def _encode_base64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+def _http_error(status: int, message: str) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), message.encode("utf-8"))
+
+
+class FakeRequest:
+    """googleapiclient의 HttpRequest처럼 execute 호출 시 응답을 반환하는 요청 객체입니다."""
+
+    def __init__(self, service: "FakeGmailService", handler: Callable[[], dict]):
+        self.service = service
+        self.handler = handler
+
+    def execute(self, http=None, num_retries: int = 0) -> dict:
+        self.service.simulate_round_trip()
+        self.service.maybe_raise_error()
+        return self.handler()
+
+
+class FakeBatchHttpRequest:
+    """
+    googleapiclient의 BatchHttpRequest처럼 여러 요청을 한 번의 왕복으로 처리합니다.
+    개별 요청에서 발생한 에러는 callback의 exception 인자로 전달됩니다.
+    BatchHttpRequest와 같이 add에 callback을 넘긴 요청은 batch의 callback 대신 그 callback을 호출합니다.
+    """
+
+    def __init__(self, service: "FakeGmailService", callback: Callable):
+        self.service = service
+        self.callback = callback
+        self.requests: list[tuple[str, FakeRequest, Optional[Callable]]] = []
+
+    def add(self, request: FakeRequest, callback: Optional[Callable] = None, request_id: Optional[str] = None):
+        self.requests.append((request_id or str(len(self.requests)), request, callback))
+
+    def execute(self, http=None):
+        self.service.simulate_round_trip()
+        for request_id, request, callback in self.requests:
+            try:
+                self.service.maybe_raise_error()
+                response, exception = request.handler(), None
+            except HttpError as e:
+                response, exception = None, e
+            (callback or self.callback)(request_id, response, exception)
+
+
+class _FakeAttachmentsResource:
+    def __init__(self, service: "FakeGmailService"):
+        self.service = service
+
+    def get(self, userId: str, messageId: str, id: str) -> FakeRequest:
+        return FakeRequest(self.service, lambda: self.service.get_attachment(messageId, id))
+
+
+class _FakeMessagesResource:
+    def __init__(self, service: "FakeGmailService"):
+        self.service = service
+
+    def get(self, userId: str, id: str, format: str = "full", metadataHeaders: Optional[list[str]] = None):
+        return FakeRequest(self.service, lambda: self.service.get_message(id, format, metadataHeaders))
+
+    def attachments(self) -> _FakeAttachmentsResource:
+        return _FakeAttachmentsResource(self.service)
+
+    def list(self, userId: str, maxResults: int = DEFAULT_PAGE_SIZE, pageToken: Optional[str] = None, **kwargs):
+        return FakeRequest(self.service, lambda: self.service.list_messages(maxResults, pageToken))
+
+
+class _FakeHistoryResource:
+    def __init__(self, service: "FakeGmailService"):
+        self.service = service
+
+    def list(self, userId: str, startHistoryId: str, pageToken: Optional[str] = None, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, lambda: self.service.list_history(startHistoryId, pageToken))
+
+
+class _FakeUsersResource:
+    def __init__(self, service: "FakeGmailService"):
+        self.service = service
+
+    def messages(self) -> _FakeMessagesResource:
+        return _FakeMessagesResource(self.service)
+
+    def history(self) -> _FakeHistoryResource:
+        return _FakeHistoryResource(self.service)
+
+    def getProfile(self, userId: str) -> FakeRequest:
+        return FakeRequest(
+            self.service, lambda: {"emailAddress": "me@example.com", "historyId": self.service.history_id}
+        )
+
+
+class FakeGmailService:
+    """
+    googleapiclient로 생성한 Gmail API 서비스 객체 대신 GmailService에 넘길 수 있는 로컬 가짜 서비스입니다.
+    users().messages()의 list/get/attachments, users().history().list, users().getProfile,
+    new_batch_http_request를 지원하며, 기록된(record_mailbox) 또는 합성한(synthetic) 메일을 응답합니다.
+
+    Args:
+        messages (list[dict]): messages.get(format="full") 응답 형식의 메일 리스트 (최신순)
+        attachments (dict[str, str]): {"{message id}/{attachment id}": base64 데이터} 형태의 첨부파일
+        latency (float): HTTP 왕복 한 번마다 추가할 지연 시간(초). batch 요청은 한 번의 왕복으로 계산합니다.
+        error_rate (float): 개별 요청이 500 에러로 실패할 확률 (0~1)
+        min_history_id (int): 이보다 오래된 historyId로 history를 조회하면 만료(404)로 응답합니다.
+        seed (int): 에러 주입에 사용할 난수 시드
+    """
+
+    def __init__(
+        self,
+        messages: list[dict],
+        attachments: Optional[dict[str, str]] = None,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        min_history_id: int = 0,
+        seed: int = 42,
+    ):
+        self.messages = messages
+        self.message_by_id = {message["id"]: message for message in messages}
+        self.attachments = attachments or {}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.min_history_id = min_history_id
+        self.history_id = str(max((int(message.get("historyId", 0)) for message in messages), default=0))
+        self.request_count = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def users(self) -> _FakeUsersResource:
+        return _FakeUsersResource(self)
+
+    def new_batch_http_request(self, callback: Callable) -> FakeBatchHttpRequest:
+        return FakeBatchHttpRequest(self, callback)
+
+    def simulate_round_trip(self):
+        with self._lock:
+            self.request_count += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def maybe_raise_error(self):
+        with self._lock:
+            is_error = self._random.random() < self.error_rate
+        if is_error:
+            raise _http_error(500, "Injected backend error")
+
+    def list_messages(self, max_results: int, page_token: Optional[str]) -> dict:
+        start = int(page_token) if page_token else 0
+        end = start + min(max_results, MAX_PAGE_SIZE)
+        response = {
+            "messages": [
+                {"id": message["id"], "threadId": message["threadId"]} for message in self.messages[start:end]
+            ],
+            "resultSizeEstimate": len(self.messages),
+        }
+        if end < len(self.messages):
+            response["nextPageToken"] = str(end)
+        return response
+
+    def get_message(self, message_id: str, format: str, metadata_headers: Optional[list[str]]) -> dict:
+        if message_id not in self.message_by_id:
+            raise _http_error(404, f"Message {message_id} not found")
+
+        message = self.message_by_id[message_id]
+        if format != "metadata":
+            return copy.deepcopy(message)
+
+        headers = message["payload"]["headers"]
+        if metadata_headers is not None:
+            headers = [header for header in headers if header["name"] in metadata_headers]
+        metadata = {key: value for key, value in message.items() if key != "payload"}
+        metadata["payload"] = {"mimeType": message["payload"]["mimeType"], "headers": copy.deepcopy(headers)}
+        return metadata
+
+    def get_attachment(self, message_id: str, attachment_id: str) -> dict:
+        data = self.attachments.get(f"{message_id}/{attachment_id}")
+        if data is None:
+            raise _http_error(404, f"Attachment {attachment_id} not found")
+        return {"attachmentId": attachment_id, "size": len(data) * 3 // 4, "data": data}
+
+    def list_history(self, start_history_id: str, page_token: Optional[str]) -> dict:
+        if int(start_history_id) < self.min_history_id:
+            raise _http_error(404, f"History {start_history_id} has expired")
+
+        # history는 오래된 순으로 반환
+        added_messages = [
+            message for message in reversed(self.messages) if int(message.get("historyId", 0)) > int(start_history_id)
+        ]
+        start = int(page_token) if page_token else 0
+        end = start + DEFAULT_PAGE_SIZE
+        response = {
+            "history": [
+                {
+                    "id": message["historyId"],
+                    "messagesAdded": [
+                        {
+                            "message": {
+                                "id": message["id"],
+                                "threadId": message["threadId"],
+                                "labelIds": message.get("labelIds", []),
+                            }
+                        }
+                    ],
+                }
+                for message in added_messages[start:end]
+            ],
+            "historyId": self.history_id,
+        }
+        if end < len(added_messages):
+            response["nextPageToken"] = str(end)
+        return response
+
+    @classmethod
+    def synthetic(
+        cls,
+        n: int,
+        attachments_per_mail: int = 1,
+        ad_ratio: float = 0.1,
+        body_sentences: int = 20,
+        **kwargs,
+    ) -> "FakeGmailService":
+        """
+        합성 MIME 트리로 구성된 메일 n개를 가진 가짜 서비스를 생성합니다.
+        첨부파일은 Document Parse를 호출하지 않도록 지원되지 않는 형식(.txt)으로 만듭니다.
+
+        Args:
+            n (int): 생성할 메일 수
+            attachments_per_mail (int): 메일당 첨부파일 수
+            ad_ratio (float): 제목에 "(광고)"가 붙는 메일의 비율
+            body_sentences (int): 본문 문장 수
+            **kwargs: FakeGmailService 생성자에 전달할 인자 (latency, error_rate 등)
+        """
+        messages = []
+        attachments = {}
+        ad_interval = int(1 / ad_ratio) if ad_ratio > 0 else 0
+        for i in range(n, 0, -1):
+            message_id = f"{i:016x}"
+            is_ad = ad_interval > 0 and i % ad_interval == 0
+            subject = f"{'(광고) ' if is_ad else ''}[공지] 테스트 메일 {i}"
+            body = "\n".join(f"{i}번 메일의 {j}번째 문장입니다." for j in range(body_sentences))
+
+            parts = [
+                {
+                    "partId": "0",
+                    "mimeType": "text/plain",
+                    "filename": "",
+                    "body": {"data": _encode_base64(body.encode("utf-8"))},
+                }
+            ]
+            for j in range(attachments_per_mail):
+                attachment_id = f"att-{i}-{j}"
+                data = f"{i}번 메일의 {j}번째 첨부파일입니다.\n".encode("utf-8") * 100
+                attachments[f"{message_id}/{attachment_id}"] = _encode_base64(data)
+                parts.append(
+                    {
+                        "partId": str(j + 1),
+                        "mimeType": "text/plain",
+                        "filename": f"attachment_{i}_{j}.txt",
+                        "body": {"attachmentId": attachment_id, "size": len(data)},
+                    }
+                )
+
+            messages.append(
+                {
+                    "id": message_id,
+                    "threadId": message_id,
+                    "labelIds": ["INBOX", "CATEGORY_PROMOTIONS" if is_ad else "CATEGORY_PERSONAL"],
+                    "historyId": str(i),
+                    "payload": {
+                        "mimeType": "multipart/mixed",
+                        "headers": [
+                            {"name": "From", "value": f"sender{i % 7}@example.com"},
+                            {"name": "To", "value": "me@example.com"},
+                            {"name": "Subject", "value": subject},
+                            {"name": "Date", "value": "Mon, 10 Feb 2025 09:00:00 +0900"},
+                        ],
+                        "parts": parts,
+                    },
+                }
+            )
+
+        return cls(messages, attachments, **kwargs)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "FakeGmailService":
+        """
+        record_mailbox로 기록한 JSON 파일을 재생하는 가짜 서비스를 생성합니다.
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            recorded = json.load(file)
+        return cls(recorded["messages"], recorded["attachments"], **kwargs)
+
+
+def record_mailbox(service, path: str, query: str = "", max_mails: int = 100):
+    """
+    실제 Gmail API 서비스 객체로 메일과 첨부파일을 가져와 FakeGmailService.from_file로 재생할 수 있는 JSON으로 저장합니다.
+
+    Args:
+        service: googleapiclient로 생성한 Gmail API 서비스 객체
+        path (str): 저장할 JSON 파일 경로
+        query (str): messages.list에 전달할 검색어 (예: "after:2025/01/10")
+        max_mails (int): 기록할 최대 메일 수
+    """
+    messages = []
+    attachments = {}
+    page_token = None
+    while len(messages) < max_mails:
+        message_list = (
+            service.users()
+            .messages()
+            .list(
+                userId="me",
+                maxResults=min(max_mails - len(messages), MAX_PAGE_SIZE),
+                q=query,
+                labelIds=["INBOX"],
+                pageToken=page_token,
+            )
+            .execute()
+        )
+        for msg_meta in message_list.get("messages", []):
+            message = service.users().messages().get(userId="me", id=msg_meta["id"]).execute()
+            messages.append(message)
+
+            parts = [message.get("payload", {})]
+            while parts:
+                part = parts.pop()
+                parts.extend(part.get("parts", []))
+                attachment_id = part.get("body", {}).get("attachmentId")
+                if attachment_id:
+                    attachment = (
+                        service.users()
+                        .messages()
+                        .attachments()
+                        .get(userId="me", messageId=message["id"], id=attachment_id)
+                        .execute()
+                    )
+                    attachments[f"{message['id']}/{attachment_id}"] = attachment["data"]
+
+        page_token = message_list.get("nextPageToken")
+        if not page_token:
+            break
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"messages": messages, "attachments": attachments}, file, ensure_ascii=False)
+    print(f"Recorded {len(messages)} mails to {path}")
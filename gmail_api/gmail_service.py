@@ -1,59 +1,291 @@
+import logging
+import os
+import threading
+import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterator, Optional
 
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.errors import HttpError
 from tqdm import tqdm
 
 from gmail_api.mail import Mail
+from gmail_api.mail_filter import MailFilter, MailFilterChain
 from gmail_api.utils import (
     decode_base64,
-    delete_file,
-    parse_document,
+    get_parse_cache,
+    parse_base64_data,
     replace_image_pattern_with,
     replace_url_pattern_from,
-    save_file,
 )
 from utils.configuration import Config
 
+# Gmail batch 요청 하나에 담을 수 있는 최대 요청 개수
+MAX_BATCH_SIZE = 100
+# messages.list 한 페이지로 가져올 수 있는 최대 메일 개수
+MAX_PAGE_SIZE = 500
+# 필터링 단계에서 format=metadata로 가져올 헤더
+METADATA_HEADERS = ["From", "To", "Cc", "Subject", "Date"]
+# 실패한 요청을 다시 보내기 전 기다리는 시간(초), 재시도마다 2배로 늘어남
+RETRY_BACKOFF = 1.0
+
 
 class GmailService:
-    def __init__(self, service):
+    def __init__(self, service, start_history_id: Optional[str] = None, mail_filter: Optional[MailFilter] = None):
+        """
+        Args:
+            service: googleapiclient로 생성한 Gmail API 서비스 객체
+            start_history_id (str, optional): 이전 실행에서 마지막으로 확인한 Gmail historyId.
+                값이 있으면 해당 시점 이후에 추가된 메일만 가져옵니다.
+            mail_filter (MailFilter, optional): 본문을 가져오기 전에 메타데이터로 메일을 거르는 필터.
+                None이면 config.yml의 gmail.filters 설정으로 생성합니다.
+        """
         self.service = service
+        self.start_history_id = start_history_id
+        self.mail_filter = mail_filter or MailFilterChain.from_config(Config.config["gmail"]["filters"])
+        self.last_history_id: Optional[str] = None
+        self.failed_message_ids: set[str] = set()
+        self._thread_local = threading.local()
+
+    def fetch_mails(self) -> Iterator[Mail]:
+        """
+        메일 목록을 페이지 단위로 가져오면서 Mail 객체가 만들어지는 대로 반환하는 generator입니다.
+        전체 목록을 기다리지 않고 첫 메일부터 후속 작업을 시작할 수 있으며, 다음 페이지는 필요할 때 요청합니다.
+
+        메일마다 먼저 헤더만(format=metadata) 가져와 필터를 적용하고,
+        필터를 통과한 메일만 본문과 첨부파일을 가져옵니다.
+
+        증분 동기화에서는 모든 메일을 반환한 뒤에 last_history_id를 기록합니다.
+        재시도 후에도 가져오지 못한 메일이 있으면 last_history_id를 start_history_id로 유지하여
+        다음 실행에서 그 메일을 다시 가져옵니다.
 
-    def fetch_mails(self):
+        Yields:
+            Mail: 필터를 통과한 메일 객체 (최신순)
+        """
         start_date = Config.config["gmail"]["start_date"]
         end_date = Config.config["gmail"]["end_date"]
         n = Config.config["gmail"]["max_mails"]
+        batch_size = max(min(Config.config["gmail"]["batch_size"], MAX_BATCH_SIZE), 1)
+
+        self.last_history_id = None
+        self.failed_message_ids = set()
+        current_history_id = None
+        if Config.config["gmail"]["incremental_sync"]:
+            # 메일 목록을 가져오기 전의 historyId를 기록해 두어야 실행 중 도착한 메일을 놓치지 않음
+            current_history_id = self._get_current_history_id()
+
+        messages = self._iter_messages(start_date, n)
+        mail_count = 0
+        # 증분 동기화에서는 n개로 제한하지 않으므로 전체 개수를 표시하지 않음
+        with tqdm(total=None if self.start_history_id else n, desc="Processing Emails") as progress_bar:
+            while listed_ids := [msg_meta["id"] for msg_meta in islice(messages, batch_size)]:
+                message_ids = self._filter_messages(listed_ids)
+                progress_bar.update(len(listed_ids) - len(message_ids))  # 필터링된 메일
+                message_details = self._get_messages_details(message_ids)
+                for message_id in message_ids:
+                    progress_bar.update(1)
+                    message = message_details.get(message_id)
+                    if message is None:  # 재시도 후에도 가져오지 못했거나 삭제된 메일은 건너뜀
+                        continue
+                    mail_count += 1
+                    mail_id = f"{end_date}/{mail_count:04d}"
+                    body, attachments = self._process_message(message)
+                    headers = self._process_headers(message)
+                    yield Mail(message_id, mail_id, body, attachments, headers)
+
+        if self.failed_message_ids:
+            logging.warning(
+                f"Failed to fetch {len(self.failed_message_ids)} messages. "
+                f"Keeping history {self.start_history_id} to fetch them again in the next run."
+            )
+            self.last_history_id = self.start_history_id
+        else:
+            self.last_history_id = current_history_id
+
+        parse_cache = get_parse_cache()
+        if parse_cache is not None:
+            # gmail_error.log에는 WARNING 이상만 기록되므로 파이프라인의 다른 진행 상황과 같이 출력
+            print(f"Parse cache hits: {parse_cache.hits}, misses: {parse_cache.misses} ({parse_cache.hit_rate:.1%})")
+
+    def _iter_messages(self, date: str, n: int) -> Iterator[dict]:
+        """
+        start_history_id가 없으면 date 이후의 메일을 최대 n개 가져옵니다.
+        start_history_id가 있으면 그 이후에 추가된 메일을 n, date와 관계없이 모두 가져옵니다.
+        fetch_mails가 last_history_id를 현재 시점으로 옮기므로, 여기서 일부를 버리면 그 메일은 이후 실행에서도 가져올 수 없습니다.
+        (상세 정보를 가져오지 못한 메일은 _get_messages_details가 failed_message_ids에 기록합니다.)
+        """
+        if not self.start_history_id:
+            return self._iter_today_n_messages(date, n)
+
+        try:
+            return iter(self._get_history_messages(self.start_history_id))
+        except HttpError as error:
+            # historyId가 만료된 경우(404) 전체 목록 조회로 대체
+            if error.resp.status != 404:
+                raise
+            logging.warning(f"History {self.start_history_id} has expired. Falling back to full sync.")
+            return self._iter_today_n_messages(date, n)
+
+    def _get_current_history_id(self) -> str:
+        return self.service.users().getProfile(userId="me").execute()["historyId"]
+
+    def _get_history_messages(self, start_history_id: str) -> list[dict]:
+        """
+        start_history_id 이후 INBOX에 추가된 메일 목록을 모두 최신순으로 가져옵니다.
+
+        Raises:
+            HttpError: historyId가 만료된 경우 404 에러가 발생합니다.
+        """
+        added_messages = {}
+        page_token = None
+        while True:
+            response = (
+                self.service.users()
+                .history()
+                .list(
+                    userId="me",
+                    startHistoryId=start_history_id,
+                    historyTypes=["messageAdded"],
+                    labelId="INBOX",
+                    pageToken=page_token,
+                )
+                .execute()
+            )
+            for history in response.get("history", []):
+                for added in history.get("messagesAdded", []):
+                    added_messages[added["message"]["id"]] = added["message"]
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+        # history는 오래된 순으로 반환되므로 messages.list와 같은 최신순으로 뒤집음
+        return list(reversed(added_messages.values()))
+
+    def _iter_today_n_messages(self, date: str, n: int = 100) -> Iterator[dict]:
+        """
+        date 이후 INBOX의 메일 목록을 nextPageToken을 따라가며 최대 n개까지 가져옵니다.
+        다음 페이지는 이전 페이지의 메일을 모두 소비한 뒤에 요청합니다.
+        """
+        page_token = None
+        remaining = n
+        while remaining > 0:
+            message_list = (
+                self.service.users()
+                .messages()
+                .list(
+                    userId="me",
+                    maxResults=min(remaining, MAX_PAGE_SIZE),
+                    q=f"after:{date}",
+                    labelIds=["INBOX"],
+                    pageToken=page_token,
+                )
+                .execute()
+            )
+            messages = message_list.get("messages", [])[:remaining]
+            remaining -= len(messages)
+            yield from messages
 
-        messages = self._get_today_n_messages(start_date, n)
-        mail_dict = {}
-        for idx, msg_meta in enumerate(tqdm(messages, desc="Processing Emails")):
-            mail_id = f"{end_date}/{len(messages)-idx:04d}"
-            message = self._get_message_details(msg_meta["id"])
-            body, attachments = self._process_message(message)
-            headers = self._process_headers(message)
-            mail = Mail(msg_meta["id"], mail_id, body, attachments, headers)
-            # 예시로 (광고) 필터만 적용
-            if "(광고)" not in mail.subject:
-                mail_dict[msg_meta["id"]] = mail
-        return mail_dict
-
-    def _get_today_n_messages(self, date: str, n: int = 100):
-        message_list = (
-            self.service.users()
-            .messages()
-            .list(userId="me", maxResults=n, q=f"after:{date}", labelIds=["INBOX"])
-            .execute()
-        )
-        return message_list.get("messages", [])
-
-    def _get_message_details(self, message_id):
-        return self.service.users().messages().get(userId="me", id=message_id).execute()
+            page_token = message_list.get("nextPageToken")
+            if not page_token:
+                break
+
+    def _filter_messages(self, message_ids: list[str]) -> list[str]:
+        """
+        헤더와 라벨만 가져와 필터를 적용하고, 통과한 메일의 id만 순서대로 반환합니다.
+        """
+        metadata = self._get_messages_details(message_ids, format="metadata", metadataHeaders=METADATA_HEADERS)
+        return [
+            message_id
+            for message_id in message_ids
+            if message_id in metadata
+            and not self.mail_filter.is_excluded(
+                self._process_headers(metadata[message_id]), metadata[message_id].get("labelIds", [])
+            )
+        ]
+
+    def _get_message_details(self, message_id, **kwargs):
+        return self.service.users().messages().get(userId="me", id=message_id, **kwargs).execute()
+
+    def _get_messages_details(self, message_ids: list[str], **kwargs) -> dict[str, dict]:
+        """
+        Gmail batch 요청으로 여러 메일의 상세 정보를 한 번에 가져옵니다.
+        batch 내 개별 요청이 실패하면 실패한 메일만 모아 지수 백오프 후 다시 요청합니다(최대 gmail.max_retries회).
+        그래도 가져오지 못한 메일은 failed_message_ids에 기록하고, 삭제된 메일(404)은 다시 요청하지 않고 건너뜁니다.
+
+        Args:
+            message_ids (list[str]): 가져올 Gmail message id 리스트
+            **kwargs: messages.get에 전달할 추가 인자 (예: format="metadata")
+
+        Returns:
+            dict[str, dict]: {message id: messages.get 응답} 형태의 딕셔너리
+        """
+        max_retries = Config.config["gmail"]["max_retries"]
+        message_details = {}
+        pending_ids = list(message_ids)
+        for attempt in range(max_retries + 1):
+            if attempt > 0:
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            errors = self._request_messages_details(pending_ids, message_details, **kwargs)
+            pending_ids = [message_id for message_id, error in errors.items() if not _is_not_found(error)]
+            if not pending_ids:
+                break
+
+        for message_id, error in errors.items():
+            if _is_not_found(error):
+                logging.warning(f"Message {message_id} was not found. Skipping it.")
+            else:
+                logging.warning(f"Failed to fetch message {message_id} after {max_retries} retries: {error}")
+                self.failed_message_ids.add(message_id)
+        return message_details
+
+    def _request_messages_details(
+        self, message_ids: list[str], message_details: dict[str, dict], **kwargs
+    ) -> dict[str, Exception]:
+        """
+        메일 상세 정보를 한 번씩 요청하여 message_details에 추가하고, 실패한 요청의 {message id: 에러}를 반환합니다.
+        """
+        errors = {}
+        batch_size = min(Config.config["gmail"]["batch_size"], MAX_BATCH_SIZE)
+        if batch_size <= 1:
+            for message_id in message_ids:
+                try:
+                    message_details[message_id] = self._get_message_details(message_id, **kwargs)
+                except (HttpError, OSError, httplib2.HttpLib2Error) as e:
+                    errors[message_id] = e
+            return errors
+
+        for start in range(0, len(message_ids), batch_size):
+            self._request_messages_batch(message_ids[start : start + batch_size], message_details, errors, **kwargs)
+        return errors
+
+    def _request_messages_batch(
+        self, message_ids: list[str], message_details: dict[str, dict], errors: dict[str, Exception], **kwargs
+    ):
+        def callback(request_id, response, exception):
+            if exception is not None:
+                errors[request_id] = exception
+                return
+            message_details[request_id] = response
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for message_id in message_ids:
+            batch.add(self.service.users().messages().get(userId="me", id=message_id, **kwargs), request_id=message_id)
+        try:
+            batch.execute()
+        except (HttpError, OSError, httplib2.HttpLib2Error) as e:
+            # batch 요청 자체가 실패한 경우(timeout 등) 응답을 받지 못한 메일을 모두 실패로 처리
+            errors.update({message_id: e for message_id in message_ids if message_id not in message_details})
 
     def _process_message(self, message):
         payload = message.get("payload", {})
-        body, filenames = self._process_message_part(message["id"], payload)  # 임시, 아래에서 재호출에 주의
+        body, attachment_parts = self._process_message_part(payload)
+        files = deque(self._process_attachments(message["id"], attachment_parts))
 
-        # 여기서는 그냥 body, filenames만 리턴하도록 예시
-        replaced_body, attachments = replace_image_pattern_with(body, filenames)
+        replaced_body, attachments = replace_image_pattern_with(body, files)
         replaced_body = replace_url_pattern_from(replaced_body)
         return replaced_body, attachments
 
@@ -68,35 +300,72 @@ class GmailService:
             "date": next((item["value"] for item in headers if item["name"] == "Date"), None),
         }
 
-    def _process_message_part(self, message_id: str, part: dict, files: deque = None):
-        if files is None:
-            files = deque()
+    def _process_message_part(self, part: dict, attachment_parts: list[dict] = None):
+        if attachment_parts is None:
+            attachment_parts = []
 
         mime_type = part["mimeType"]
         body_data = part.get("body", {}).get("data")
 
         if mime_type == "text/plain" and body_data:
             decoded_bytes = decode_base64(body_data)
-            return decoded_bytes.decode("utf-8", errors="replace"), files
+            return decoded_bytes.decode("utf-8", errors="replace"), attachment_parts
 
-        if part.get("filename"):  # 첨부파일 처리
-            files = self._process_attachment(message_id, part, files)
-            return "", files
+        if part.get("filename"):  # 첨부파일은 본문 순서대로 모아 두었다가 한 번에 처리
+            attachment_parts.append(part)
+            return "", attachment_parts
 
         # multipart
         plain_text = ""
         if "multipart" in mime_type:
             for sub_part in part.get("parts", []):
-                text, files = self._process_message_part(message_id, sub_part, files)
+                text, attachment_parts = self._process_message_part(sub_part, attachment_parts)
                 plain_text += text
 
-        return plain_text, files
+        return plain_text, attachment_parts
+
+    def _process_attachments(self, message_id: str, attachment_parts: list[dict]) -> list[str]:
+        """
+        첨부파일 다운로드와 파싱을 제한된 개수의 worker로 동시에 처리합니다.
+        결과는 본문에 등장한 순서를 유지하므로 [image: ...] 치환 순서가 보장됩니다.
+        가져오거나 파싱하지 못한 첨부파일도 파일 이름으로 자리를 유지하여 이후 첨부파일의 치환 위치가 밀리지 않습니다.
+        """
+        max_workers = min(Config.config["gmail"]["attachment_workers"], len(attachment_parts))
+        if max_workers <= 1:
+            parsed_files = [self._process_attachment(message_id, part) for part in attachment_parts]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                parsed_files = list(
+                    executor.map(lambda part: self._process_attachment(message_id, part), attachment_parts)
+                )
+
+        return parsed_files
 
-    def _process_attachment(self, message_id, part, files, save_dir="downloaded_files"):
+    def _process_attachment(self, message_id: str, part: dict) -> str:
         att_id = part["body"]["attachmentId"]
-        att = self.service.users().messages().attachments().get(userId="me", messageId=message_id, id=att_id).execute()
-        saved_file_path = save_file(decode_base64(att["data"]), part["filename"], save_dir=save_dir)
-        if saved_file_path:  # 파일이 정상적으로 저장된 경우
-            files.append(parse_document(saved_file_path))
-            delete_file(saved_file_path)
-        return files
+        try:
+            att = self._execute(
+                self.service.users().messages().attachments().get(userId="me", messageId=message_id, id=att_id)
+            )
+        except HttpError as e:
+            # 첨부파일 하나를 가져오지 못해도 메일 전체 처리는 계속 진행
+            logging.warning(f"Failed to fetch attachment {part['filename']} of message {message_id}: {e}")
+            # 지원하지 않는 형식과 같이 파일 이름을 남겨 [image: ...] 자리를 유지
+            return os.path.basename(part["filename"])
+        return parse_base64_data(att["data"], part["filename"]) or os.path.basename(part["filename"])
+
+    def _execute(self, request):
+        """
+        googleapiclient의 http 객체는 thread-safe하지 않으므로 스레드마다 별도의 http 객체로 요청을 실행합니다.
+        """
+        credentials = getattr(getattr(self.service, "_http", None), "credentials", None)
+        if credentials is None:
+            return request.execute()
+
+        if not hasattr(self._thread_local, "http"):
+            self._thread_local.http = AuthorizedHttp(credentials, http=httplib2.Http())
+        return request.execute(http=self._thread_local.http)
+
+
+def _is_not_found(error: Exception) -> bool:
+    return isinstance(error, HttpError) and error.resp.status == 404
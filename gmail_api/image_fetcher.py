@@ -0,0 +1,100 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import as_completed
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ImageFetcher:
+    """
+    메일 본문에 포함된 URL의 이미지를 병렬로 내려받는 클래스입니다.
+    keep-alive 세션을 공유해 연결을 재사용하고, 본문을 받기 전에 Content-Type을 확인하여 이미지가 아닌 응답은 건너뜁니다.
+
+    Args:
+        max_workers (int): 동시에 내려받을 URL 개수
+        max_bytes (int): 이미지 하나의 최대 크기(byte). 초과하는 이미지는 건너뜁니다.
+        timeout (float): 요청 하나의 연결/읽기 timeout(초)
+        time_budget (float): 메일 하나의 URL들을 처리하는 데 쓸 최대 시간(초). 초과 시 남은 URL은 건너뜁니다.
+    """
+
+    def __init__(self, max_workers: int, max_bytes: int, timeout: float, time_budget: float):
+        self.max_workers = max_workers
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.time_budget = time_budget
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch_all(self, urls: list[str]) -> dict[str, tuple[str, bytes]]:
+        """
+        URL 리스트의 이미지를 병렬로 내려받습니다.
+
+        Args:
+            urls (list[str]): 이미지를 가져올 URL 리스트
+
+        Returns:
+            dict[str, tuple[str, bytes]]: {url: (파일 이름, 이미지 데이터)} 형태의 딕셔너리. 이미지가 아니거나 실패한 URL은 제외됩니다.
+        """
+        deadline = time.monotonic() + self.time_budget
+        unique_urls = list(dict.fromkeys(urls))
+        images = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = {executor.submit(self._fetch, url, deadline): url for url in unique_urls}
+        try:
+            for future in as_completed(futures, timeout=self.time_budget):
+                url = futures[future]
+                try:
+                    image = future.result()
+                except Exception as e:
+                    logging.warning(f"Failed to process {url}: {e}")
+                    continue
+                if image is not None:
+                    images[url] = image
+        except FuturesTimeoutError:
+            skipped_count = sum(1 for future in futures if not future.done())
+            logging.warning(f"Image fetch time budget exceeded. Skipped {skipped_count} URLs.")
+        finally:
+            # 시간 초과 시 대기 중인 요청은 취소하고, 실행 중인 요청은 deadline을 확인하며 스스로 종료됨
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return images
+
+    def _fetch(self, url: str, deadline: float) -> Optional[tuple[str, bytes]]:
+        if time.monotonic() >= deadline:
+            return None
+
+        with self.session.get(url, stream=True, timeout=self.timeout) as response:
+            content_type = response.headers.get("Content-Type", "")
+            if "image" not in content_type:
+                return None
+
+            content_length = response.headers.get("Content-Length")
+            if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+                logging.warning(f"Skipped {url}: image size {content_length} bytes exceeds the limit")
+                return None
+
+            file_data = bytearray()
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                file_data.extend(chunk)
+                if len(file_data) > self.max_bytes:
+                    logging.warning(f"Skipped {url}: image size exceeds the limit")
+                    return None
+                if time.monotonic() >= deadline:
+                    return None
+
+        file_extension = content_type.split("/")[-1].split(";")[0]
+        file_name = url.split("/")[-1].split("?")[0]
+        if not file_name.endswith(file_extension):
+            file_name += f".{file_extension}"
+
+        return file_name, bytes(file_data)
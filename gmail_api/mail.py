@@ -1,4 +1,49 @@
+import os
+import tempfile
+import weakref
+from typing import Optional, Union
+
+from utils.token_usage_counter import TokenUsageCounter
+
+# 이 길이(문자 수)를 넘는 첨부파일 텍스트는 임시 파일로 내려두고 필요할 때 읽음
+LAZY_ATTACHMENT_CHARS = 10_000
+
+
+class LazyText:
+    """
+    긴 텍스트를 임시 파일에 저장해 두고 load를 호출할 때만 읽어오는 클래스입니다.
+    객체가 사라지면 임시 파일도 함께 삭제됩니다.
+    """
+
+    __slots__ = ("path", "length", "__weakref__")
+
+    def __init__(self, text: str):
+        fd, self.path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+        self.length = len(text)
+        weakref.finalize(self, os.remove, self.path)
+
+    def load(self) -> str:
+        with open(self.path, "r", encoding="utf-8") as file:
+            return file.read()
+
+
 class Mail:
+    __slots__ = (
+        "message_id",
+        "id",
+        "sender",
+        "recipients",
+        "subject",
+        "body",
+        "cc",
+        "date",
+        "token_count",
+        "_attachments",
+        "_rendered",
+    )
+
     def __init__(
         self,
         message_id: str,
@@ -20,15 +65,55 @@ class Mail:
         self.subject = headers["subject"]
         self.body = body
         self.cc = [headers["cc"]] if headers["cc"] is not None else []
-        self.attachments = attachments if attachments is not None else []
         self.date = headers["date"]
 
+        attachments = attachments if attachments is not None else []
+        self._attachments: list[Union[str, LazyText]] = [
+            LazyText(item) if len(item) > LAZY_ATTACHMENT_CHARS else item for item in attachments
+        ]
+        self._rendered: Optional[str] = None
+        # 프롬프트 길이 확인용 추정 토큰 수 (렌더링하지 않고 각 필드로 계산)
+        self.token_count = sum(
+            TokenUsageCounter.estimate_tokens(text)
+            for text in [self.sender or "", self.subject or "", self.date or "", self.body, *attachments]
+        )
+
+    @property
+    def attachments(self) -> list[str]:
+        return [item.load() if isinstance(item, LazyText) else item for item in self._attachments]
+
+    def fit_to_token_budget(self, max_tokens: int) -> int:
+        """
+        추정 토큰 수가 max_tokens를 넘으면 뒤쪽 첨부파일부터 제외하여 프롬프트 길이를 줄입니다.
+        본문만으로 max_tokens를 넘는 경우에는 첨부파일을 모두 제외한 상태로 둡니다.
+
+        Returns:
+            int: 제외한 첨부파일 개수
+        """
+        dropped_count = 0
+        while self.token_count > max_tokens and self._attachments:
+            item = self._attachments.pop()
+            self.token_count -= TokenUsageCounter.estimate_tokens(item.load() if isinstance(item, LazyText) else item)
+            dropped_count += 1
+        if dropped_count:
+            self._rendered = None
+        return dropped_count
+
+    def release(self):
+        """
+        메모이즈된 렌더링 결과를 해제합니다. 요약이 끝난 메일에 호출하여 첨부파일 텍스트가 메모리에 남지 않도록 합니다.
+        """
+        self._rendered = None
+
     def __str__(self) -> str:
+        if self._rendered is not None:
+            return self._rendered
+
         attachments_text = ""
-        if self.attachments:
+        if self._attachments:
             for i, item in enumerate(self.attachments):
                 attachments_text += f"첨부파일 {i + 1}:\n{item}\n\n"
-        return (
+        self._rendered = (
             f"보낸 사람: {self.sender}\n"
             f"받는 사람: {', '.join(self.recipients)}\n"
             f"참조: {', '.join(self.cc)}\n"
@@ -37,3 +122,4 @@ class Mail:
             f"본문:\n{self.body}\n"
             f"{attachments_text}"
         )
+        return self._rendered
@@ -0,0 +1,80 @@
+from abc import ABC, abstractmethod
+
+
+class MailFilter(ABC):
+    """
+    메일 본문을 가져오기 전에 메타데이터(헤더, 라벨)만 보고 메일을 제외할지 판단하는 필터의 기본 클래스입니다.
+    새로운 필터는 이 클래스를 상속하여 is_excluded를 구현한 뒤 MailFilterChain에 추가합니다.
+    """
+
+    @abstractmethod
+    def is_excluded(self, headers: dict[str, str], label_ids: list[str]) -> bool:
+        """
+        Args:
+            headers (dict[str, str]): GmailService._process_headers 형식의 헤더 딕셔너리
+            label_ids (list[str]): 메일에 붙은 Gmail 라벨 id 리스트
+
+        Returns:
+            bool: 메일을 제외해야 하는 경우 True
+        """
+
+
+class SubjectFilter(MailFilter):
+    """제목에 제외 키워드(예: "(광고)")가 포함된 메일을 제외합니다."""
+
+    def __init__(self, deny_keywords: list[str]):
+        self.deny_keywords = deny_keywords
+
+    def is_excluded(self, headers: dict[str, str], label_ids: list[str]) -> bool:
+        subject = headers["subject"] or ""
+        return any(keyword in subject for keyword in self.deny_keywords)
+
+
+class SenderFilter(MailFilter):
+    """
+    발신자 허용/차단 목록으로 메일을 제외합니다. 목록의 항목은 From 헤더에 포함되는지(대소문자 무시)로 비교합니다.
+    허용 목록이 비어 있으면 차단 목록에 없는 모든 발신자를 허용합니다.
+    """
+
+    def __init__(self, allow_list: list[str], deny_list: list[str]):
+        self.allow_list = [sender.lower() for sender in allow_list]
+        self.deny_list = [sender.lower() for sender in deny_list]
+
+    def is_excluded(self, headers: dict[str, str], label_ids: list[str]) -> bool:
+        sender = (headers["sender"] or "").lower()
+        if any(denied in sender for denied in self.deny_list):
+            return True
+        return bool(self.allow_list) and not any(allowed in sender for allowed in self.allow_list)
+
+
+class LabelFilter(MailFilter):
+    """지정한 라벨(예: "CATEGORY_PROMOTIONS", "SPAM")이 붙은 메일을 제외합니다."""
+
+    def __init__(self, deny_labels: list[str]):
+        self.deny_labels = set(deny_labels)
+
+    def is_excluded(self, headers: dict[str, str], label_ids: list[str]) -> bool:
+        return not self.deny_labels.isdisjoint(label_ids)
+
+
+class MailFilterChain(MailFilter):
+    """여러 필터를 순서대로 적용하며, 하나라도 제외 판정을 내리면 메일을 제외합니다."""
+
+    def __init__(self, filters: list[MailFilter]):
+        self.filters = filters
+
+    def is_excluded(self, headers: dict[str, str], label_ids: list[str]) -> bool:
+        return any(mail_filter.is_excluded(headers, label_ids) for mail_filter in self.filters)
+
+    @classmethod
+    def from_config(cls, filter_config: dict) -> "MailFilterChain":
+        """
+        config.yml의 gmail.filters 설정으로 필터 체인을 생성합니다.
+        """
+        return cls(
+            [
+                SubjectFilter(filter_config["subject_deny"]),
+                SenderFilter(filter_config["sender_allow"], filter_config["sender_deny"]),
+                LabelFilter(filter_config["label_deny"]),
+            ]
+        )
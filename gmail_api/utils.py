@@ -1,15 +1,30 @@
 import base64
+import hashlib
 import logging
 import os
 import re
+import tempfile
+import threading
 from collections import deque
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Optional
 
-import requests
 from langchain_upstage import UpstageDocumentParseLoader
 
+from gmail_api.image_fetcher import ImageFetcher
+from utils.configuration import Config
+from utils.sqlite_cache import SQLiteCache
+
 logging.basicConfig(level=logging.WARNING, filename="gmail_api/gmail_error.log")
 
+# base64 문자 4개가 3 byte로 디코딩되므로 chunk 크기는 4의 배수여야 함
+BASE64_CHUNK_SIZE = 4 * 256 * 1024
+
+_parse_cache: Optional[SQLiteCache] = None
+_parse_cache_lock = threading.Lock()
+_image_fetcher: Optional[ImageFetcher] = None
+_image_fetcher_lock = threading.Lock()
+
 
 def is_supported_format(file_path: str) -> bool:
     supported_formats = ["jpeg", "png", "bmp", "pdf", "tiff", "heic", "docx", "pptx", "xlsx"]
@@ -32,34 +47,124 @@ def parse_document(file_path) -> str:
         return f"{os.path.basename(file_path)}"
 
 
-def decode_base64(data: str) -> bytes:
-    data = data.replace("-", "+").replace("_", "/")
-    return base64.b64decode(data)
+def get_parse_cache() -> Optional[SQLiteCache]:
+    """
+    파싱 결과 캐시를 반환합니다. 설정에서 비활성화된 경우 None을 반환합니다.
+    """
+    global _parse_cache
+
+    cache_config = Config.config["gmail"]["parse_cache"]
+    if not cache_config["enabled"]:
+        return None
+
+    with _parse_cache_lock:
+        if _parse_cache is None:
+            _parse_cache = SQLiteCache(cache_config["path"], max_bytes=cache_config["max_size_mb"] * 1024 * 1024)
+    return _parse_cache
+
 
+def parse_file_data(file_data: bytes, file_name: str) -> Optional[str]:
+    """
+    메모리에 있는 파일 데이터를 파싱합니다.
+    같은 내용의 파일은 SHA-256 해시를 키로 캐시된 파싱 결과를 재사용하여 Document Parse 호출을 생략합니다.
+
+    Args:
+        file_data (bytes): 디코딩된 파일 데이터
+        file_name (str): 파일 이름 (확장자로 지원 형식 여부를 판단)
+
+    Returns:
+        Optional[str]: 파싱된 텍스트. 임시 파일 생성에 실패한 경우 None
+    """
+    if not is_supported_format(file_name):
+        # 지원되지 않는 형식일 경우 파일명만 반환
+        return os.path.basename(file_name)
+
+    cache_key = hashlib.sha256(file_data).hexdigest()
+    cached_document = _get_cached_document(cache_key)
+    if cached_document is not None:
+        return cached_document
 
-def save_file(file_data: bytes, file_name: str, save_dir: str = "downloaded_files") -> Optional[str]:
     try:
-        os.makedirs(save_dir, exist_ok=True)
-        file_path = os.path.join(save_dir, file_name)
-        with open(file_path, "wb") as file:
-            file.write(file_data)
-        return file_path
-    except Exception as e:
-        print(f"An error occurred while saving the file: {e}")
+        with _create_temp_file(file_name) as temp_file:
+            temp_file.write(file_data)
+            temp_file.flush()
+            return _parse_and_cache(temp_file.name, cache_key)
+    except OSError as e:
+        print(f"An error occurred while writing the file: {e}")
         return None
 
 
-def delete_file(saved_file_path: str) -> bool:
+def parse_base64_data(data: str, file_name: str) -> Optional[str]:
+    """
+    Gmail API가 반환한 base64 첨부파일 데이터를 임시 파일로 스트리밍 디코딩한 뒤 파싱합니다.
+    디코딩된 전체 데이터를 메모리에 여러 번 복사하지 않으며, 캐시 키(SHA-256)도 디코딩과 함께 계산합니다.
+
+    Args:
+        data (str): URL-safe base64로 인코딩된 파일 데이터
+        file_name (str): 파일 이름 (확장자로 지원 형식 여부를 판단)
+
+    Returns:
+        Optional[str]: 파싱된 텍스트. 임시 파일 생성에 실패한 경우 None
+    """
+    if not is_supported_format(file_name):
+        return os.path.basename(file_name)
+
     try:
-        if os.path.exists(saved_file_path):
-            os.remove(saved_file_path)
-            return True
-        else:
-            print(f"The file does not exist: {saved_file_path}")
-            return False
-    except Exception as e:
-        print(f"An error occurred while deleting the file: {e}")
-        return False
+        with _create_temp_file(file_name) as temp_file:
+            cache_key = decode_base64_to(data, temp_file)
+            cached_document = _get_cached_document(cache_key)
+            if cached_document is not None:
+                return cached_document
+
+            temp_file.flush()
+            return _parse_and_cache(temp_file.name, cache_key)
+    except OSError as e:
+        print(f"An error occurred while writing the file: {e}")
+        return None
+
+
+def _create_temp_file(file_name: str) -> IO[bytes]:
+    # 같은 이름의 파일이 동시에 처리되어도 충돌하지 않도록 고유한 이름의 임시 파일을 사용 (닫을 때 자동 삭제)
+    file_extension = os.path.splitext(os.path.basename(file_name))[1]
+    return tempfile.NamedTemporaryFile(suffix=file_extension)
+
+
+def _get_cached_document(cache_key: str) -> Optional[str]:
+    cache = get_parse_cache()
+    return cache.get(cache_key) if cache is not None else None
+
+
+def _parse_and_cache(file_path: str, cache_key: str) -> str:
+    parsed_document = parse_document(file_path)
+    cache = get_parse_cache()
+    if cache is not None:
+        cache.set(cache_key, parsed_document)
+    return parsed_document
+
+
+def decode_base64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data)
+
+
+def decode_base64_to(data: str, file: IO[bytes], chunk_size: int = BASE64_CHUNK_SIZE) -> str:
+    """
+    URL-safe base64 데이터를 chunk 단위로 디코딩하여 파일에 기록합니다.
+
+    Args:
+        data (str): URL-safe base64로 인코딩된 데이터
+        file (IO[bytes]): 디코딩된 데이터를 기록할 파일 객체
+        chunk_size (int): 한 번에 디코딩할 문자 수 (4의 배수)
+
+    Returns:
+        str: 디코딩된 데이터의 SHA-256 hex digest
+    """
+    sha256 = hashlib.sha256()
+    for start in range(0, len(data), chunk_size):
+        chunk = data[start : start + chunk_size]
+        decoded_chunk = base64.urlsafe_b64decode(chunk + "=" * (-len(chunk) % 4))
+        sha256.update(decoded_chunk)
+        file.write(decoded_chunk)
+    return sha256.hexdigest()
 
 
 def replace_pattern_with(parsed_items: dict, text: str, pattern: str) -> str:
@@ -74,35 +179,48 @@ def remove_http_brackets(text):
     return re.sub(r"<[^>]*http[^>]*>", "", text)
 
 
-def replace_url_pattern_from(plain_text: str) -> str:
+def get_image_fetcher() -> ImageFetcher:
+    """
+    프로세스 전체에서 공유하는 ImageFetcher를 반환합니다. 연결 풀을 재사용하기 위해 한 번만 생성합니다.
+    """
+    global _image_fetcher
 
-    clean_text = remove_http_brackets(plain_text)
-    url_pattern = r"\[([^\]]+)\]"
-    urls = re.findall(url_pattern, clean_text)
-    url_to_parsed_image = {}
+    with _image_fetcher_lock:
+        if _image_fetcher is None:
+            fetch_config = Config.config["gmail"]["image_fetch"]
+            _image_fetcher = ImageFetcher(
+                max_workers=fetch_config["max_workers"],
+                max_bytes=fetch_config["max_size_mb"] * 1024 * 1024,
+                timeout=fetch_config["timeout"],
+                time_budget=fetch_config["time_budget"],
+            )
+    return _image_fetcher
 
-    for url in urls:
-        try:
-            response = requests.get(url, stream=True, timeout=10)
-            content_type = response.headers.get("Content-Type", "")
 
-            if "image" in content_type:
-                file_extension = content_type.split("/")[-1].split(";")[0]
-                file_name = url.split("/")[-1].split("?")[0]
+def replace_url_pattern_from(plain_text: str) -> str:
 
-                if not file_name.endswith(file_extension):
-                    file_name += f".{file_extension}"
+    clean_text = remove_http_brackets(plain_text)
+    url_pattern = r"\[([^\]]+)\]"
+    urls = [url for url in re.findall(url_pattern, clean_text) if url.startswith(("http://", "https://"))]
+    if not urls:
+        return clean_text
 
-                file_data = response.content
-                file_path = save_file(file_data, file_name)
+    image_fetcher = get_image_fetcher()
+    images = image_fetcher.fetch_all(urls)
 
-                if file_path:
-                    parsed_image = parse_document(file_path)
-                    url_to_parsed_image[url] = parsed_image
-                    delete_file(file_path)
-            clean_text.replace("url", "")
+    def parse_image(url: str) -> Optional[str]:
+        file_name, file_data = images[url]
+        try:
+            return parse_file_data(file_data, file_name)
         except Exception as e:
             logging.warning(f"Failed to process {url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=image_fetcher.max_workers) as executor:
+        parsed_images = executor.map(parse_image, images)
+        url_to_parsed_image = {
+            url: parsed_image for url, parsed_image in zip(images, parsed_images) if parsed_image is not None
+        }
 
     return replace_pattern_with(url_to_parsed_image, clean_text, url_pattern)
 
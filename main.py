@@ -8,6 +8,7 @@ from googleapiclient.discovery import build
 
 from gmail_api.gmail_service import GmailService
 from pipelines.pipeline import pipeline
+from prompt.template_registry import TemplateRegistry
 from utils.configuration import Config
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
@@ -32,6 +33,8 @@ def create_service():
 def main():
     load_dotenv()
     Config.load()
+    # 프롬프트 템플릿을 미리 읽고 placeholder를 검증하여 잘못된 템플릿은 LLM 호출 전에 발견
+    TemplateRegistry.preload()
 
     Config.user_upstage_api_key = os.getenv("UPSTAGE_API_KEY")
 
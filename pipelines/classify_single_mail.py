@@ -1,18 +1,34 @@
 import warnings
 from collections import Counter
+from typing import Optional
 
 import pandas as pd
 
 from agents.classification.classification_agent import ClassificationAgent
 from agents.classification.classification_type import ClassificationType
+from agents.classification.knn_classifier import KNNClassifier, append_history, get_history_path
+from agents.embedding.bge_m3_embedding import Bgem3EmbeddingAgent
+from gmail_api.mail import Mail
 from utils.configuration import Config
 
 warnings.filterwarnings("ignore", message="A single label was found in 'y_true' and 'y_pred'.*")
 
 
-def classify_single_mail(summary_dict: dict[str, str]) -> tuple[dict, dict]:
+def classify_single_mail(
+    summary_dict: dict[str, str], mail_dict: Optional[dict[str, Mail]] = None
+) -> tuple[dict, dict]:
+    """
+    메일 요약문으로 카테고리와 처리 필요 여부를 분류합니다.
+    classification.knn.enabled가 true이고 mail_dict가 주어지면 메일 제목으로 kNN 분류기를 먼저 적용하고,
+    kNN 분류기가 확신하지 못한 메일만 LLM으로 분류합니다.
+
+    Returns:
+        tuple[dict, dict]: ({message id: 카테고리}, {message id: 처리 필요 여부})
+    """
     temperature: int = Config.config["temperature"]["classification"]
     seed: int = Config.config["seed"]
+    mode: str = Config.config["classification"]["mode"]
+    knn_config: dict = Config.config["classification"]["knn"]
 
     classification_agent = ClassificationAgent("solar-pro", temperature, seed)
 
@@ -21,18 +37,38 @@ def classify_single_mail(summary_dict: dict[str, str]) -> tuple[dict, dict]:
 
     iteration = Config.config["classification"]["inference"]
 
-    categories_dict = {
-        mail_id: [
-            classification_agent.process(summary_dict[mail_id], ClassificationType.CATEGORY) for _ in range(iteration)
-        ]
-        for mail_id in summary_dict
-    }
-    actions_dict = {
-        mail_id: [
-            classification_agent.process(summary_dict[mail_id], ClassificationType.ACTION) for _ in range(iteration)
-        ]
-        for mail_id in summary_dict
-    }
+    knn_labels = {}
+    if knn_config["enabled"] and mail_dict is not None:
+        knn_labels = _classify_with_knn(summary_dict, mail_dict, knn_config)
+
+    batch_labels = {}
+    if mode == "batch":
+        batch_size = Config.config["classification"]["batch_size"]
+        items = [(mail_id, summary) for mail_id, summary in summary_dict.items() if mail_id not in knn_labels]
+        for start in range(0, len(items), batch_size):
+            batch_labels.update(classification_agent.process_batch(dict(items[start : start + batch_size]), iteration))
+
+    for mail_id, summary in summary_dict.items():
+        if mail_id in knn_labels:
+            categories_dict[mail_id] = [knn_labels[mail_id][0]] * iteration
+            actions_dict[mail_id] = [knn_labels[mail_id][1]] * iteration
+            continue
+
+        # batch 응답에서 빠졌거나 잘못 분류된 메일은 메일 단위로 다시 분류
+        labels = batch_labels.get(mail_id)
+        if not labels and mode in ("joint", "batch"):
+            labels = classification_agent.process_joint(summary, iteration)
+        if labels:
+            categories_dict[mail_id] = [category for category, _ in labels]
+            actions_dict[mail_id] = [action for _, action in labels]
+        else:
+            # separate 모드이거나 joint 응답이 모두 잘못된 경우 카테고리와 처리 필요 여부를 각각 분류
+            categories_dict[mail_id] = [
+                classification_agent.process(summary, ClassificationType.CATEGORY) for _ in range(iteration)
+            ]
+            actions_dict[mail_id] = [
+                classification_agent.process(summary, ClassificationType.ACTION) for _ in range(iteration)
+            ]
 
     pd.DataFrame(
         {
@@ -48,4 +84,39 @@ def classify_single_mail(summary_dict: dict[str, str]) -> tuple[dict, dict]:
     }
     action_dict = {mail_id: Counter(actions).most_common(1)[0][0] for mail_id, actions in actions_dict.items()}
 
+    if knn_config["enabled"] and mail_dict is not None:
+        # LLM으로 분류한 메일만 사용자별로 누적하여 kNN 분류기가 자신의 예측을 다시 학습하지 않도록 함
+        append_history(
+            get_history_path(knn_config, Config.user_id),
+            [
+                {
+                    "mail_id": mail_dict[mail_id].message_id,
+                    "subject": mail_dict[mail_id].subject,
+                    "category": category_dict[mail_id],
+                    "action": action_dict[mail_id],
+                }
+                for mail_id in summary_dict
+                if mail_id not in knn_labels
+            ],
+        )
+
     return category_dict, action_dict
+
+
+def _classify_with_knn(
+    summary_dict: dict[str, str], mail_dict: dict[str, Mail], knn_config: dict
+) -> dict[str, tuple[str, str]]:
+    classifier = KNNClassifier.from_config(Bgem3EmbeddingAgent(), knn_config, Config.user_id)
+
+    mail_ids = list(summary_dict)
+    # 임베딩을 message id로 저장해 두면 LLM으로 분류되어 기록에 추가된 메일은 다음 실행에서 다시 임베딩하지 않음
+    predictions = classifier.predict_vectors(
+        classifier.embed(
+            [mail_dict[mail_id].subject or "" for mail_id in mail_ids],
+            [mail_dict[mail_id].message_id for mail_id in mail_ids],
+        )
+    )
+    knn_labels = {mail_id: labels for mail_id, labels in zip(mail_ids, predictions) if labels is not None}
+
+    print(f"kNN 분류기가 {len(knn_labels)}/{len(mail_ids)}개 메일을 분류했습니다.")
+    return knn_labels
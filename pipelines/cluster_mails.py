@@ -1,6 +1,9 @@
+import time
 from collections import defaultdict
 
+from agents.embedding.ann_index import IVFIndex
 from agents.embedding.embedding_manager import EmbeddingManager
+from agents.embedding.embedding_store import EmbeddingStore
 from gmail_api.mail import Mail
 from utils.configuration import Config
 
@@ -11,9 +14,32 @@ def cluster_mails(mail_dict: dict[str, Mail], categories: dict[int, str]) -> dic
     for mail_id, mail in mail_dict.items():
         grouped_dict[categories[mail_id]][mail_id] = mail
 
-    return EmbeddingManager(
+    embedding_config = Config.config["embedding"]
+    embedding_store = (
+        EmbeddingStore.for_user(Config.user_id, embedding_config["model_name"])
+        if embedding_config["store"]["enabled"]
+        else None
+    )
+    history_config = embedding_config["history"]
+    history_index, history_path = None, None
+    if history_config["enabled"]:
+        history_index, history_path = IVFIndex.for_user(Config.user_id, embedding_config["model_name"])
+        # 보관 기간이 지난 메일은 연결 대상과 임베딩 저장소에서 삭제
+        expired_ids = history_index.remove_older_than(time.time() - history_config["retention_days"] * 24 * 3600)
+        if embedding_store is not None and expired_ids:
+            embedding_store.remove(expired_ids)
+            embedding_store.compact_if_stale()
+
+    similar_mails_dict = EmbeddingManager(
         embedding_model_name=Config.config["embedding"]["model_name"],
         similarity_metric=Config.config["embedding"]["similarity_metric"],
         similarity_threshold=Config.config["embedding"]["similarity_threshold"],
+        similarity_top_k=Config.config["embedding"]["similarity_top_k"],
         is_save_results=Config.config["embedding"]["save_results"],
+        embedding_store=embedding_store,
+        history_index=history_index,
     ).run(grouped_dict)
+
+    if history_index is not None:
+        history_index.save(history_path)
+    return similar_mails_dict
@@ -1,3 +1,5 @@
+from typing import Iterable, Iterator
+
 import openai
 from googleapiclient.errors import HttpError
 
@@ -10,12 +12,23 @@ from pipelines.make_report import make_report
 from pipelines.summary_single_mail import summary_single_mail
 
 
+def _collect_mails(mails: Iterable[Mail], mail_dict: dict[str, Mail]) -> Iterator[Mail]:
+    """
+    메일을 다음 단계로 그대로 흘려보내면서 mail_dict에 기록합니다.
+    """
+    for mail in mails:
+        mail_dict[mail.message_id] = mail
+        yield mail
+
+
 def pipeline(gmail_service: GmailService):
     try:
-        mail_dict: dict[str, Mail] = gmail_service.fetch_mails()
-
-        summary_dict = summary_single_mail(mail_dict)
-        category_dict, action_dict = classify_single_mail(summary_dict)
+        # 메일을 가져오는 대로 요약을 시작하고, 가져온 메일은 이후 단계를 위해 mail_dict에 모아 둠
+        mail_dict: dict[str, Mail] = {}
+        summary_dict = summary_single_mail(_collect_mails(gmail_service.fetch_mails(), mail_dict))
+        # 요약에 실패한 메일은 이후 단계에서 제외
+        mail_dict = {message_id: mail_dict[message_id] for message_id in summary_dict}
+        category_dict, action_dict = classify_single_mail(summary_dict, mail_dict)
 
         similar_mails_dict = cluster_mails(mail_dict, category_dict)
 
@@ -1,25 +1,101 @@
+import asyncio
+from typing import Iterable, Iterator, Optional
+
 import pandas as pd
 
 from agents.self_refine.self_refine_agent import SelfRefineAgent
 from agents.summary.summary_agent import SummaryAgent
 from gmail_api.mail import Mail
 from utils.configuration import Config
+from utils.llm_client import LLMClient
+
+
+def summary_single_mail(mails: Iterable[Mail]) -> dict[str, str]:
+    """
+    메일마다 요약과 Self-refine을 수행합니다.
+    config.yml의 self_refine.concurrency가 1보다 크면 여러 메일을 동시에 처리합니다.
 
+    Args:
+        mails (Iterable[Mail]): 요약할 메일. generator인 경우 메일을 가져오는 대로 요약을 시작합니다.
 
-def summary_single_mail(mail_dict: dict[str, Mail]) -> dict[str, str]:
+    Returns:
+        dict[str, str]: {message id: 요약} 형태의 딕셔너리 (입력 순서 유지).
+            요약 중 에러가 발생한 메일은 포함되지 않습니다.
+    """
     temperature: int = Config.config["temperature"]["summary"]
     seed: int = Config.config["seed"]
+    concurrency: int = Config.config["self_refine"]["concurrency"]
 
     summary_agent = SummaryAgent("solar-pro", "single", temperature, seed)
     self_refine_agent = SelfRefineAgent("solar-pro", temperature, seed)
 
-    summary_dict = {
-        mail_id: self_refine_agent.process(mail, summary_agent.process(str(mail)))
-        for mail_id, mail in mail_dict.items()
-    }
+    mails = _fit_to_token_budget(mails, Config.config["self_refine"]["max_mail_tokens"])
+    if concurrency > 1:
+        summary_dict = asyncio.run(_summary_mails_concurrently(mails, summary_agent, self_refine_agent, concurrency))
+    else:
+        summary_dict = {}
+        for mail in mails:
+            try:
+                summary_dict[mail.message_id] = self_refine_agent.process(mail, summary_agent.process(str(mail)))
+            except Exception as e:
+                # 한 메일의 실패가 다른 메일의 요약에 영향을 주지 않도록 에러를 기록하고 건너뜀
+                print(f"[{mail.id}] 요약 중 에러가 발생하여 건너뜁니다: {e!r}")
+            finally:
+                mail.release()  # 요약이 끝난 메일의 렌더링 결과(첨부파일 포함)를 메모리에서 해제
 
     pd.DataFrame.from_dict(summary_dict, orient="index", columns=["summary"]).to_csv(
         "evaluation/data/generated_summary.csv", index_label="id"
     )
 
     return summary_dict
+
+
+def _fit_to_token_budget(mails: Iterable[Mail], max_tokens: Optional[int]) -> Iterator[Mail]:
+    """
+    추정 토큰 수가 max_tokens를 넘는 메일은 요약 전에 뒤쪽 첨부파일부터 제외합니다. generator의 지연 실행은 유지합니다.
+    """
+    for mail in mails:
+        if max_tokens is not None and mail.token_count > max_tokens:
+            dropped_count = mail.fit_to_token_budget(max_tokens)
+            print(f"[{mail.id}] 추정 토큰 수가 {max_tokens}를 넘어 첨부파일 {dropped_count}개를 제외하고 요약합니다.")
+        yield mail
+
+
+async def _summary_mails_concurrently(
+    mails: Iterable[Mail], summary_agent: SummaryAgent, self_refine_agent: SelfRefineAgent, concurrency: int
+) -> dict[str, str]:
+    """
+    최대 concurrency개의 메일을 동시에 요약합니다.
+    메일을 가져오는 generator는 blocking 호출이므로 별도 스레드에서 하나씩 꺼내며,
+    동시에 처리 중인 메일이 concurrency개에 도달하면 다음 메일을 가져오지 않고 기다립니다.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    mail_iterator: Iterator[Mail] = iter(mails)
+    tasks: list[tuple[str, asyncio.Task]] = []
+
+    async def summarize(mail: Mail) -> Optional[str]:
+        try:
+            summary = await summary_agent.aprocess(str(mail))
+            return await self_refine_agent.aprocess(mail, summary)
+        except Exception as e:
+            # 한 메일의 실패가 다른 메일의 요약에 영향을 주지 않도록 에러를 기록하고 건너뜀
+            print(f"[{mail.id}] 요약 중 에러가 발생하여 건너뜁니다: {e!r}")
+            return None
+        finally:
+            mail.release()
+            semaphore.release()
+
+    try:
+        while True:
+            await semaphore.acquire()
+            mail = await asyncio.to_thread(next, mail_iterator, None)
+            if mail is None:
+                semaphore.release()
+                break
+            tasks.append((mail.message_id, asyncio.create_task(summarize(mail))))
+
+        summaries = await asyncio.gather(*(task for _, task in tasks))
+    finally:
+        # asyncio.run마다 새 event loop와 연결 풀이 만들어지므로 loop가 닫히기 전에 연결을 정리
+        await LLMClient.aclose_async()
+    return {message_id: summary for (message_id, _), summary in zip(tasks, summaries) if summary is not None}
@@ -1,5 +1,7 @@
 import os
 
+from prompt.template_registry import TEMPLATE_DIR, TemplateRegistry
+
 
 def load_template(template_type: str, file_name: str) -> str:
     """
@@ -19,14 +21,7 @@ def load_template(template_type: str, file_name: str) -> str:
         str:
             템플릿 파일의 내용을 문자열로 반환.
     """
-    base_dir = os.path.dirname(__file__)
-    file_path = os.path.join(base_dir, "template", template_type, file_name)
-
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Template file '{file_name}' not found.")
-
-    with open(file_path, "r", encoding="utf-8") as file:
-        return file.read().strip()
+    return TemplateRegistry.load(os.path.join(TEMPLATE_DIR, template_type, file_name), strip=True)
 
 
 def load_template_with_variables(template_type: str, file_name: str, **kwargs):
@@ -45,5 +40,4 @@ def load_template_with_variables(template_type: str, file_name: str, **kwargs):
         str: 변수 값이 치환된 템플릿 문자열.
     """
 
-    template = load_template(template_type, file_name)
-    return template.format(**kwargs)
+    return TemplateRegistry.render(os.path.join(TEMPLATE_DIR, template_type, file_name), strip=True, **kwargs)
@@ -0,0 +1,110 @@
+import os
+import re
+import string
+import threading
+from typing import Any, NamedTuple
+
+import yaml
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "template")
+
+
+class _TemplateEntry(NamedTuple):
+    mtime: float
+    content: Any  # txt 템플릿은 str, yaml 파일은 파싱된 객체
+    fields: frozenset  # txt 템플릿의 placeholder 이름
+
+
+class TemplateRegistry:
+    """
+    프롬프트 템플릿(txt)과 설정(yaml) 파일을 메모리에 올려 두고 재사용하는 레지스트리입니다.
+    파일은 처음 사용할 때(또는 preload 시) 한 번만 읽고, 이후에는 수정 시각(mtime)이 바뀐 경우에만 다시 읽습니다.
+    txt 템플릿은 읽을 때 placeholder를 파싱해 두어 잘못된 중괄호나 누락된 변수를 LLM 호출 전에 확인합니다.
+    """
+
+    _entries: dict[str, _TemplateEntry] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def preload(cls, template_dir: str = TEMPLATE_DIR):
+        """
+        template_dir 아래의 모든 txt, yaml 파일을 읽고 placeholder를 검증합니다.
+
+        Raises:
+            ValueError: 템플릿의 중괄호 형식이 잘못된 경우
+        """
+        for root, _, file_names in os.walk(template_dir):
+            for file_name in sorted(file_names):
+                if file_name.endswith((".txt", ".yaml", ".yml")):
+                    cls._get_entry(os.path.join(root, file_name))
+
+    @classmethod
+    def load(cls, path: str, strip: bool = False) -> str:
+        """
+        템플릿 파일의 내용을 반환합니다. strip이 True이면 앞뒤 공백을 제거합니다.
+
+        Raises:
+            FileNotFoundError: 파일이 존재하지 않을 경우
+        """
+        content = cls._get_entry(path).content
+        return content.strip() if strip else content
+
+    @classmethod
+    def render(cls, path: str, strip: bool = False, **kwargs) -> str:
+        """
+        템플릿의 placeholder를 kwargs로 채운 문자열을 반환합니다. strip이 True이면 치환 전에 앞뒤 공백을 제거합니다.
+
+        Raises:
+            FileNotFoundError: 파일이 존재하지 않을 경우
+            KeyError: 템플릿에 필요한 변수가 kwargs에 없는 경우
+        """
+        entry = cls._get_entry(path)
+        missing_fields = entry.fields - kwargs.keys()
+        if missing_fields:
+            raise KeyError(f"Template '{path}' requires variables {sorted(missing_fields)}.")
+        content = entry.content.strip() if strip else entry.content
+        return content.format(**kwargs)
+
+    @classmethod
+    def load_yaml(cls, path: str) -> Any:
+        """
+        yaml 파일을 파싱한 결과를 반환합니다. 반환된 객체는 공유되므로 수정하지 않아야 합니다.
+
+        Raises:
+            FileNotFoundError: 파일이 존재하지 않을 경우
+            yaml.YAMLError: YAML 파싱 중 오류가 발생할 경우
+        """
+        return cls._get_entry(path).content
+
+    @classmethod
+    def _get_entry(cls, path: str) -> _TemplateEntry:
+        abs_path = os.path.abspath(path)
+        try:
+            mtime = os.stat(abs_path).st_mtime
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Template file '{path}' not found.")
+
+        entry = cls._entries.get(abs_path)
+        if entry is not None and entry.mtime == mtime:
+            return entry
+
+        with cls._lock:
+            entry = cls._read_entry(abs_path, mtime)
+            cls._entries[abs_path] = entry
+        return entry
+
+    @staticmethod
+    def _read_entry(path: str, mtime: float) -> _TemplateEntry:
+        with open(path, "r", encoding="utf-8") as file:
+            if path.endswith((".yaml", ".yml")):
+                return _TemplateEntry(mtime, yaml.safe_load(file), frozenset())
+            content = file.read()
+
+        try:
+            # "{mail.id}", "{items[0]}" 형태는 변수 이름(mail, items)만 필요한 변수로 취급
+            fields = frozenset(
+                re.split(r"[.\[]", field)[0] for _, field, _, _ in string.Formatter().parse(content) if field
+            )
+        except ValueError as e:
+            raise ValueError(f"Template '{path}' has an invalid placeholder: {e}")
+        return _TemplateEntry(mtime, content, fields)
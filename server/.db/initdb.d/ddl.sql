@@ -19,3 +19,10 @@ CREATE TABLE report_temp_tb
     refresh_time TIMESTAMP NOT NULL,
     created_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+CREATE TABLE user_sync_tb
+(
+    user_id    BIGINT PRIMARY KEY,
+    history_id VARCHAR(30) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from agents.embedding.ann_index import IVFIndex
+
+
+def _clustered_vectors(size: int, dim: int = 16, n_topics: int = 10, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(n_topics, dim))
+    return (topics[rng.integers(n_topics, size=size)] + 0.1 * rng.normal(size=(size, dim))).astype(np.float32)
+
+
+def _ids(size: int) -> list[str]:
+    return [f"mail-{i}" for i in range(size)]
+
+
+def test_search_without_training_is_exact():
+    vectors = _clustered_vectors(20)
+    index = IVFIndex(min_train_size=256)
+    index.add(_ids(20), vectors)
+
+    assert index.centroids is None
+    results = index.search(vectors[:3], k=1)
+    assert [neighbors[0][0] for neighbors in results] == ["mail-0", "mail-1", "mail-2"]
+    assert results[0][0][1] == pytest.approx(1.0)
+
+
+def test_search_applies_k_and_threshold():
+    vectors = _clustered_vectors(100, n_topics=2)
+    index = IVFIndex(min_train_size=1000)
+    index.add(_ids(100), vectors)
+
+    neighbors = index.search(vectors[:1], k=5, threshold=0.5)[0]
+    scores = [score for _, score in neighbors]
+    assert len(neighbors) == 5
+    assert scores == sorted(scores, reverse=True)
+    assert min(scores) >= 0.5
+    assert index.search(-vectors[:1], k=5, threshold=0.99) == [[]]
+
+
+def test_trained_search_matches_exact_search():
+    vectors = _clustered_vectors(400)
+    index = IVFIndex(n_probe=4, min_train_size=100)
+    index.add(_ids(400), vectors)
+
+    assert index.centroids is not None
+    queries = vectors[:20] + 0.01
+    approximate = index.search(queries, k=5)
+    exact = index.search(queries, k=5, exact=True)
+    recall = np.mean([len({i for i, _ in a} & {i for i, _ in e}) / 5 for a, e in zip(approximate, exact)])
+    assert recall >= 0.9
+
+
+def test_add_replaces_existing_id():
+    vectors = _clustered_vectors(10)
+    index = IVFIndex()
+    index.add(_ids(10), vectors)
+    index.add(["mail-0"], vectors[5:6])
+
+    assert len(index) == 10
+    neighbor_ids = {neighbor_id for neighbor_id, _ in index.search(vectors[5:6], k=2)[0]}
+    assert neighbor_ids == {"mail-0", "mail-5"}
+
+
+def test_remove():
+    vectors = _clustered_vectors(10)
+    index = IVFIndex()
+    index.add(_ids(10), vectors)
+
+    assert index.remove(["mail-3", "missing"]) == 1
+    assert len(index) == 9
+    assert "mail-3" not in {neighbor_id for neighbor_id, _ in index.search(vectors[3:4], k=10)[0]}
+
+
+def test_remove_older_than_returns_removed_ids():
+    index = IVFIndex()
+    index.add(_ids(6), _clustered_vectors(6), timestamps=np.array([1, 2, 3, 4, 5, 6], dtype=np.float64))
+
+    assert index.remove_older_than(4) == ["mail-0", "mail-1", "mail-2"]
+    assert index.ids == ["mail-3", "mail-4", "mail-5"]
+    assert index.remove_older_than(4) == []
+    assert index.remove_older_than(100) == ["mail-3", "mail-4", "mail-5"]
+    assert len(index) == 0
+    assert index.search(_clustered_vectors(1), k=1) == [[]]
+
+
+def test_remove_below_min_train_size_drops_centroids():
+    index = IVFIndex(min_train_size=50)
+    index.add(_ids(60), _clustered_vectors(60), timestamps=np.arange(60, dtype=np.float64))
+    assert index.centroids is not None
+
+    index.remove_older_than(20)
+    assert index.centroids is None
+    assert len(index) == 40
+
+
+@pytest.mark.parametrize("size", [0, 30, 300])
+def test_save_and_load(tmp_path, size):
+    vectors = _clustered_vectors(max(size, 1))[:size]
+    index = IVFIndex(n_probe=2, min_train_size=100)
+    index.add(_ids(size), vectors, timestamps=np.arange(size, dtype=np.float64))
+    path = str(tmp_path / "user" / "index.npz")
+    index.save(path)
+
+    loaded = IVFIndex(n_probe=2, min_train_size=100)
+    loaded.load(path)
+
+    assert loaded.ids == index.ids
+    np.testing.assert_array_equal(loaded.timestamps, index.timestamps)
+    assert loaded.trained_size == index.trained_size
+    assert (loaded.centroids is None) == (index.centroids is None)
+    queries = _clustered_vectors(5, seed=1)
+    assert loaded.search(queries, k=3) == index.search(queries, k=3)
+
+    # 불러온 인덱스에서도 추가와 삭제가 가능
+    loaded.add(["new"], queries[:1])
+    assert loaded.search(queries[:1], k=1)[0][0][0] == "new"
+    assert loaded.remove_older_than(size // 2) == _ids(size)[: size // 2]
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pytest
+
+from agents.embedding.embedding_store import EmbeddingStore
+
+
+def _vectors(message_ids: list[str], dim: int = 4, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {message_id: rng.normal(size=dim).astype(np.float32) for message_id in message_ids}
+
+
+def test_get_many_returns_added_vectors(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model")
+    texts = {"a": "첫 번째 메일", "b": "두 번째 메일"}
+    vectors = _vectors(list(texts))
+    store.add_many(texts, vectors)
+
+    found = store.get_many({**texts, "c": "저장하지 않은 메일"})
+    assert set(found) == {"a", "b"}
+    for message_id in found:
+        np.testing.assert_array_equal(found[message_id], vectors[message_id])
+
+
+def test_get_many_skips_changed_text(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model")
+    store.add_many({"a": "원래 텍스트"}, _vectors(["a"]))
+
+    assert store.get_many({"a": "바뀐 텍스트"}) == {}
+    # 모델이 다르면 같은 텍스트라도 content hash가 달라짐
+    assert EmbeddingStore(str(tmp_path), "other-model").get_many({"a": "원래 텍스트"}) == {}
+
+
+def test_add_many_replaces_existing_message(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model")
+    store.add_many({"a": "v1"}, _vectors(["a"], seed=0))
+    new_vectors = _vectors(["a"], seed=1)
+    store.add_many({"a": "v2"}, new_vectors)
+
+    np.testing.assert_array_equal(store.get_many({"a": "v2"})["a"], new_vectors["a"])
+    assert store.num_rows == 2
+    assert store.stale_ratio == pytest.approx(0.5)
+
+
+def test_add_many_rejects_other_dimension(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model")
+    store.add_many({"a": "a"}, _vectors(["a"], dim=4))
+
+    with pytest.raises(ValueError):
+        store.add_many({"b": "b"}, _vectors(["b"], dim=8))
+
+
+def test_remove_and_reload(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model")
+    texts = {"a": "a", "b": "b", "c": "c"}
+    vectors = _vectors(list(texts))
+    store.add_many(texts, vectors)
+    store.remove(["b", "missing"])
+
+    reloaded = EmbeddingStore(str(tmp_path), "model")
+    found = reloaded.get_many(texts)
+    assert set(found) == {"a", "c"}
+    np.testing.assert_array_equal(found["c"], vectors["c"])
+    assert reloaded.stale_ratio == pytest.approx(1 / 3)
+
+
+def test_compact_keeps_valid_rows_and_removes_previous_generation(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model")
+    texts = {message_id: message_id for message_id in "abcd"}
+    vectors = _vectors(list(texts))
+    store.add_many(texts, vectors)
+    store.remove(["a", "c"])
+
+    store.compact()
+
+    assert store.generation == 1
+    assert store.num_rows == 2
+    assert store.stale_ratio == 0.0
+    assert sorted(os.listdir(tmp_path)) == ["index-1.jsonl", "meta.json", "vectors-1.f32"]
+    for current in (store, EmbeddingStore(str(tmp_path), "model")):
+        found = current.get_many(texts)
+        assert set(found) == {"b", "d"}
+        np.testing.assert_array_equal(found["d"], vectors["d"])
+
+    # compact 이후에도 이어서 추가할 수 있음
+    store.add_many({"e": "e"}, _vectors(["e"]))
+    assert set(EmbeddingStore(str(tmp_path), "model").get_many({**texts, "e": "e"})) == {"b", "d", "e"}
+
+
+def test_ignores_partially_written_rows(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model")
+    store.add_many({"a": "a"}, _vectors(["a"]))
+    with open(tmp_path / "vectors-0.f32", "ab") as file:
+        file.write(b"\x00" * 6)
+    with open(tmp_path / "index-0.jsonl", "a", encoding="utf-8") as file:
+        file.write('{"message_id": "b", "content_ha')
+
+    reloaded = EmbeddingStore(str(tmp_path), "model")
+    assert reloaded.num_rows == 1
+    assert set(reloaded.get_many({"a": "a", "b": "b"})) == {"a"}
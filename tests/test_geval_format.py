@@ -0,0 +1,18 @@
+from agents.reflexion.json_formats import GEVAL_SCORE_RANGES, create_geval_format
+
+
+def test_limits_each_aspect_to_its_score_range():
+    aspects = list(GEVAL_SCORE_RANGES.keys())
+    schema = create_geval_format(aspects)["json_schema"]["schema"]
+
+    assert schema["required"] == aspects
+    assert schema["properties"]["fluency"]["enum"] == [1, 2, 3]
+    for aspect in ("consistency", "coherence", "relevance"):
+        assert schema["properties"][aspect]["enum"] == [1, 2, 3, 4, 5]
+
+
+def test_includes_only_requested_aspects():
+    response_format = create_geval_format(["fluency"])
+
+    assert response_format["json_schema"]["strict"] is True
+    assert list(response_format["json_schema"]["schema"]["properties"]) == ["fluency"]
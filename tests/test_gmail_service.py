@@ -0,0 +1,89 @@
+import pytest
+
+from gmail_api import gmail_service
+from gmail_api.fake_gmail_service import FakeGmailService, _http_error
+from gmail_api.gmail_service import GmailService
+from utils.configuration import Config
+
+
+@pytest.fixture(autouse=True)
+def config(monkeypatch):
+    Config.load()
+    monkeypatch.setitem(Config.config["gmail"], "incremental_sync", True)
+    monkeypatch.setitem(Config.config["gmail"], "batch_size", 10)
+    monkeypatch.setitem(Config.config["gmail"], "max_retries", 2)
+    monkeypatch.setattr(gmail_service.time, "sleep", lambda seconds: None)
+
+
+def _fail_message(service: FakeGmailService, message_id: str, times: int):
+    # message_id의 상세 정보 요청을 times번 500 에러로 실패시킴
+    get_message = service.get_message
+    remaining = [times]
+
+    def failing_get_message(requested_id, format, metadata_headers):
+        if requested_id == message_id and remaining[0] > 0:
+            remaining[0] -= 1
+            raise _http_error(500, "Injected backend error")
+        return get_message(requested_id, format, metadata_headers)
+
+    service.get_message = failing_get_message
+
+
+@pytest.mark.parametrize("batch_size", [1, 10])
+def test_retries_failed_messages(monkeypatch, batch_size):
+    monkeypatch.setitem(Config.config["gmail"], "batch_size", batch_size)
+    service = FakeGmailService.synthetic(5, attachments_per_mail=0, ad_ratio=0)
+    _fail_message(service, service.messages[2]["id"], times=2)
+    gmail = GmailService(service, start_history_id="0")
+
+    mails = list(gmail.fetch_mails())
+
+    assert len(mails) == 5
+    assert gmail.failed_message_ids == set()
+    assert gmail.last_history_id == service.history_id
+
+
+def test_keeps_start_history_id_when_message_keeps_failing():
+    service = FakeGmailService.synthetic(5, attachments_per_mail=0, ad_ratio=0)
+    failed_id = service.messages[2]["id"]
+    _fail_message(service, failed_id, times=100)
+    gmail = GmailService(service, start_history_id="0")
+
+    mails = list(gmail.fetch_mails())
+
+    assert len(mails) == 4
+    assert gmail.failed_message_ids == {failed_id}
+    assert gmail.last_history_id == "0"
+
+
+def test_skips_deleted_messages_without_blocking_history():
+    service = FakeGmailService.synthetic(5, attachments_per_mail=0, ad_ratio=0)
+    deleted_id = service.messages[2]["id"]
+    get_message = service.get_message
+
+    def get_message_after_delete(requested_id, format, metadata_headers):
+        if requested_id == deleted_id and format != "metadata":
+            raise _http_error(404, f"Message {requested_id} not found")
+        return get_message(requested_id, format, metadata_headers)
+
+    service.get_message = get_message_after_delete
+    gmail = GmailService(service, start_history_id="0")
+
+    mails = list(gmail.fetch_mails())
+
+    assert deleted_id not in {mail.message_id for mail in mails}
+    assert gmail.failed_message_ids == set()
+    assert gmail.last_history_id == service.history_id
+
+
+@pytest.mark.parametrize("attachment_workers", [1, 4])
+def test_keeps_slot_of_failed_attachment(monkeypatch, attachment_workers):
+    monkeypatch.setitem(Config.config["gmail"], "attachment_workers", attachment_workers)
+    service = FakeGmailService.synthetic(1, attachments_per_mail=3, ad_ratio=0)
+    message = service.messages[0]
+    del service.attachments[f"{message['id']}/att-1-1"]
+    attachment_parts = [part for part in message["payload"]["parts"] if part["filename"]]
+
+    parsed_files = GmailService(service)._process_attachments(message["id"], attachment_parts)
+
+    assert parsed_files == ["attachment_1_0.txt", "attachment_1_1.txt", "attachment_1_2.txt"]
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.classification.knn_classifier import KNNClassifier, append_history, get_history_path
+from utils.configuration import Config
+
+
+class FakeEmbeddingAgent:
+    """텍스트의 첫 글자로 방향이 정해지는 벡터를 반환하고, 임베딩한 텍스트를 기록하는 가짜 임베딩 에이전트입니다."""
+
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.embedded_texts: list[str] = []
+
+    def process_batch(self, texts: list[str]) -> np.ndarray:
+        self.embedded_texts.extend(texts)
+        vectors = np.zeros((len(texts), 4), dtype=np.float32)
+        for row, text in enumerate(texts):
+            vectors[row, ord(text[0]) % 4] = 1.0
+        return vectors
+
+
+@pytest.fixture
+def knn_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        Config,
+        "config",
+        {"embedding": {"store": {"enabled": True, "path": str(tmp_path / "embeddings"), "compact_ratio": 0.5}}},
+    )
+    examples_path = tmp_path / "ground_truth.csv"
+    pd.DataFrame([{"mail_id": "example-0", "subject": "a 공지", "category": "academic", "action": "read only"}]).to_csv(
+        examples_path, index=False, encoding="utf-8-sig"
+    )
+    return {
+        "k": 1,
+        "threshold": 0.8,
+        "min_similarity": 0.6,
+        "examples_path": str(examples_path),
+        "history_path": str(tmp_path / "history"),
+    }
+
+
+def test_history_is_separated_by_user(knn_config):
+    append_history(
+        get_history_path(knn_config, "1"),
+        [{"mail_id": "m-1", "subject": "b 과제", "category": "academic", "action": "action needed"}],
+    )
+
+    user_classifier = KNNClassifier.from_config(FakeEmbeddingAgent(), knn_config, "1")
+    other_classifier = KNNClassifier.from_config(FakeEmbeddingAgent(), knn_config, "2")
+
+    assert user_classifier.predict("b 제출") == ("academic", "action needed")
+    assert other_classifier.predict("b 제출") is None
+    assert len(other_classifier.categories) == 1
+
+
+def test_embeds_examples_and_history_once(knn_config):
+    append_history(
+        get_history_path(knn_config, "1"),
+        [{"mail_id": "m-1", "subject": "b 과제", "category": "academic", "action": "action needed"}],
+    )
+    KNNClassifier.from_config(FakeEmbeddingAgent(), knn_config, "1").embed(["c 새 메일"], ["m-2"])
+    append_history(
+        get_history_path(knn_config, "1"),
+        [{"mail_id": "m-2", "subject": "c 새 메일", "category": "other", "action": "read only"}],
+    )
+
+    embedding_agent = FakeEmbeddingAgent()
+    classifier = KNNClassifier.from_config(embedding_agent, knn_config, "1")
+
+    assert embedding_agent.embedded_texts == []
+    assert len(classifier.categories) == 3
+    assert classifier.predict("c 다른 메일") == ("other", "read only")
+
+
+def test_without_user_id_uses_only_examples(knn_config):
+    append_history(
+        get_history_path(knn_config, "1"),
+        [{"mail_id": "m-1", "subject": "b 과제", "category": "academic", "action": "action needed"}],
+    )
+    embedding_agent = FakeEmbeddingAgent()
+    classifier = KNNClassifier.from_config(embedding_agent, knn_config)
+
+    assert classifier.embedding_store is None
+    assert classifier.categories == ["academic"]
+    assert embedding_agent.embedded_texts == ["a 공지"]
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat.chat_completion import ChatCompletion
+
+from utils.configuration import Config
+from utils.llm_cache import LLMResponseCache
+
+
+class FakeClient:
+    """chat.completions.create 호출마다 다른 내용의 응답을 반환하는 가짜 OpenAI 클라이언트입니다."""
+
+    base_url = "https://api.example.com/v1/"
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs) -> ChatCompletion:
+        self.calls += 1
+        return ChatCompletion.model_validate(
+            {
+                "id": f"response-{self.calls}",
+                "object": "chat.completion",
+                "created": 0,
+                "model": kwargs["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": f"응답 {self.calls}"},
+                    }
+                ],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            }
+        )
+
+
+@pytest.fixture(autouse=True)
+def llm_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        Config,
+        "config",
+        {
+            "llm_cache": {
+                "enabled": True,
+                "path": str(tmp_path / "llm_cache.sqlite"),
+                "max_size_mb": 1,
+                "ttl_hours": None,
+            }
+        },
+    )
+    monkeypatch.setattr(LLMResponseCache, "_cache", None)
+
+
+def _content(response: ChatCompletion) -> str:
+    return response.choices[0].message.content
+
+
+REQUEST = {"model": "solar-pro", "messages": [{"role": "user", "content": "요약"}], "temperature": 0, "seed": 42}
+
+
+def test_returns_cached_response_without_usage():
+    client = FakeClient()
+    first = LLMResponseCache.create(client, **REQUEST)
+    second = LLMResponseCache.create(client, **REQUEST)
+
+    assert client.calls == 1
+    assert _content(second) == _content(first)
+    assert second.usage.total_tokens == 0
+
+
+def test_use_cache_false_regenerates_and_replaces_stored_response():
+    client = FakeClient()
+    LLMResponseCache.create(client, **REQUEST)
+    regenerated = LLMResponseCache.create(client, use_cache=False, **REQUEST)
+
+    assert client.calls == 2
+    assert _content(regenerated) == "응답 2"
+    assert _content(LLMResponseCache.create(client, **REQUEST)) == "응답 2"
+
+
+def test_invalidate_removes_stored_response():
+    client = FakeClient()
+    LLMResponseCache.create(client, **REQUEST)
+    LLMResponseCache.invalidate(client, **REQUEST)
+
+    assert _content(LLMResponseCache.create(client, **REQUEST)) == "응답 2"
+    assert client.calls == 2
+
+
+def test_calls_api_when_disabled(monkeypatch):
+    monkeypatch.setitem(Config.config["llm_cache"], "enabled", False)
+    client = FakeClient()
+    LLMResponseCache.create(client, **REQUEST)
+    LLMResponseCache.create(client, **REQUEST)
+    LLMResponseCache.invalidate(client, **REQUEST)
+
+    assert client.calls == 2
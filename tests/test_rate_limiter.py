@@ -0,0 +1,145 @@
+import json
+
+import httpx
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import RateLimitedTransport, RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 토큰이 다시 채워지는 시간을 결정적으로 만들기 위해 time.monotonic을 고정된 시계로 교체
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # 실제로 기다리지 않고 기다려야 했던 시간만 기록
+    recorded = []
+    monkeypatch.setattr(rate_limiter.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_token_bucket_waits_when_empty(clock):
+    bucket = TokenBucket(60)  # 초당 1개
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+
+    clock[0] += 2
+    assert bucket.reserve(0) == 0.0
+
+
+def test_token_bucket_caps_reservation_at_capacity(clock):
+    bucket = TokenBucket(60)
+
+    # 한도보다 큰 요청도 capacity만큼만 차감
+    assert bucket.reserve(1000) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_token_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(60)
+    bucket.reserve(30)
+
+    clock[0] += 3600
+    assert bucket.reserve(0) == 0.0
+    assert bucket.available == pytest.approx(60)
+
+
+def test_token_bucket_update_only_lowers_remaining(clock):
+    bucket = TokenBucket(60)
+    bucket.reserve(10)
+
+    bucket.update(limit=120, remaining=100)
+    assert bucket.capacity == 120
+    assert bucket.available == pytest.approx(50)
+
+    bucket.update(remaining=20)
+    assert bucket.available == pytest.approx(20)
+
+
+def test_token_bucket_update_waits_for_reset_when_exhausted(clock):
+    bucket = TokenBucket(60)
+
+    bucket.update(remaining=0, reset=5)
+    assert bucket.reserve(0) == pytest.approx(5.0)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("1s", 1.0), ("6m0s", 360.0), ("20ms", 0.02), ("0.5", 0.5), ("1h2m", 3720.0)],
+)
+def test_parse_duration(value, expected):
+    assert rate_limiter._parse_duration(value) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("value", [None, "", "Wed, 21 Oct 2015 07:28:00 GMT"])
+def test_parse_duration_ignores_unknown_format(value):
+    assert rate_limiter._parse_duration(value) is None
+
+
+def _request(body: dict) -> httpx.Request:
+    return httpx.Request("POST", "https://api.example.com/v1/chat/completions", content=json.dumps(body).encode())
+
+
+def test_limiter_estimates_prompt_and_completion_tokens(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1000, expected_completion_tokens=100)
+
+    tokens_without_max = limiter._estimate_tokens(_request({"messages": []}))
+    tokens_with_max = limiter._estimate_tokens(_request({"messages": [], "max_tokens": 10, "n": 2}))
+
+    assert tokens_without_max - tokens_with_max == 100 - 10 * 2
+
+
+def test_transport_learns_limits_from_headers(clock, sleeps):
+    headers = {
+        "x-ratelimit-limit-requests": "120",
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "3s",
+        "x-ratelimit-limit-tokens": "100000",
+        "x-ratelimit-remaining-tokens": "99000",
+        "x-ratelimit-reset-tokens": "1s",
+    }
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=100000, expected_completion_tokens=0)
+    transport = RateLimitedTransport(httpx.MockTransport(lambda request: httpx.Response(200, headers=headers)), limiter)
+
+    with httpx.Client(transport=transport) as client:
+        client.post("https://api.example.com/v1/chat/completions", json={"messages": []})
+        client.post("https://api.example.com/v1/chat/completions", json={"messages": []})
+
+    assert limiter.requests.capacity == 120
+    # 첫 요청은 바로 보내고, 남은 요청 수가 0이므로 두 번째 요청은 reset 이후 1개가 찰 때까지 기다림
+    assert sleeps[0] == 0.0
+    assert sleeps[1] == pytest.approx(3 + 60 / 120)
+
+
+def test_transport_waits_retry_after_on_429(clock, sleeps):
+    responses = iter([httpx.Response(429, headers={"retry-after": "2"}), httpx.Response(200)])
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=100000, expected_completion_tokens=0)
+    transport = RateLimitedTransport(httpx.MockTransport(lambda request: next(responses)), limiter)
+
+    with httpx.Client(transport=transport) as client:
+        assert client.get("https://api.example.com/v1/models").status_code == 429
+        assert client.get("https://api.example.com/v1/models").status_code == 200
+
+    assert sleeps[0] == 0.0
+    assert sleeps[1] == pytest.approx(2 + 1)
+
+
+def test_get_shares_limiter_per_api_key(monkeypatch):
+    monkeypatch.setattr(
+        rate_limiter.Config,
+        "config",
+        {"rate_limit": {"requests_per_minute": 10, "tokens_per_minute": 1000, "expected_completion_tokens": 1}},
+        raising=False,
+    )
+    monkeypatch.setattr(RateLimiter, "_limiters", {})
+
+    assert RateLimiter.get("key-a") is RateLimiter.get("key-a")
+    assert RateLimiter.get("key-a") is not RateLimiter.get("key-b")
+    assert RateLimiter.get("key-a").requests.capacity == 10
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from agents.embedding.similarity_search import normalize_rows, search_similar
+
+
+def _brute_force(matrix: np.ndarray, threshold: float, top_k=None) -> set[tuple[int, int]]:
+    similarity_matrix = matrix @ matrix.T
+    pairs = set()
+    for i, row in enumerate(similarity_matrix):
+        neighbors = [j for j in np.argsort(-row, kind="stable") if j != i and row[j] >= threshold]
+        pairs.update((i, j) for j in neighbors[:top_k])
+    return pairs
+
+
+@pytest.fixture
+def embedding_matrix():
+    return np.random.default_rng(0).normal(size=(50, 8)).astype(np.float32)
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1024])
+@pytest.mark.parametrize("threshold", [-np.inf, 0.0, 0.5])
+def test_matches_brute_force(embedding_matrix, threshold, block_size):
+    matrix = normalize_rows(embedding_matrix)
+    pairs = search_similar(matrix, threshold=threshold, block_size=block_size)
+
+    assert set(zip(pairs.query_indices.tolist(), pairs.neighbor_indices.tolist())) == _brute_force(matrix, threshold)
+    np.testing.assert_allclose(
+        pairs.scores, np.sum(matrix[pairs.query_indices] * matrix[pairs.neighbor_indices], 1), atol=1e-6
+    )
+
+
+@pytest.mark.parametrize("top_k", [0, 1, 3, 49, 100])
+def test_top_k_matches_brute_force(embedding_matrix, top_k):
+    matrix = normalize_rows(embedding_matrix)
+    pairs = search_similar(matrix, threshold=0.0, top_k=top_k, block_size=16)
+
+    assert set(zip(pairs.query_indices.tolist(), pairs.neighbor_indices.tolist())) == _brute_force(matrix, 0.0, top_k)
+
+
+def test_normalize_computes_cosine_similarity(embedding_matrix):
+    pairs = search_similar(embedding_matrix * 10, normalize=True)
+    expected = search_similar(normalize_rows(embedding_matrix))
+
+    np.testing.assert_array_equal(pairs.query_indices, expected.query_indices)
+    np.testing.assert_allclose(pairs.scores, expected.scores, atol=1e-6)
+
+
+def test_sorted_by_query_then_score(embedding_matrix):
+    pairs = search_similar(embedding_matrix, normalize=True, block_size=8)
+
+    assert np.all(np.diff(pairs.query_indices) >= 0)
+    for query in np.unique(pairs.query_indices):
+        assert np.all(np.diff(pairs.scores[pairs.query_indices == query]) <= 0)
+
+
+def test_excludes_self_pairs():
+    pairs = search_similar(np.ones((3, 4), dtype=np.float32), normalize=True)
+
+    assert len(pairs.query_indices) == 6
+    assert not np.any(pairs.query_indices == pairs.neighbor_indices)
+
+
+def test_empty_matrix():
+    pairs = search_similar(np.empty((0, 4), dtype=np.float32))
+
+    assert len(pairs.query_indices) == len(pairs.neighbor_indices) == len(pairs.scores) == 0
@@ -0,0 +1,74 @@
+import pytest
+
+from utils import sqlite_cache
+from utils.sqlite_cache import SQLiteCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # accessed_at, created_at 순서를 결정적으로 만들기 위해 time.time을 고정된 시계로 교체
+    now = [1000.0]
+    monkeypatch.setattr(sqlite_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_get_returns_stored_value_and_counts_hits(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), max_bytes=1024)
+    cache.set("key", "값")
+
+    assert cache.get("key") == "값"
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate == 0.5
+
+
+def test_evicts_least_recently_used_when_over_max_bytes(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), max_bytes=30)
+    for key in ("a", "b", "c"):
+        cache.set(key, "x" * 10)
+        clock[0] += 1
+
+    # a를 조회하여 가장 최근에 사용한 항목으로 만들면 다음 추가 시 b가 삭제됨
+    assert cache.get("a") is not None
+    clock[0] += 1
+    cache.set("d", "x" * 10)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+
+
+def test_skips_value_larger_than_max_bytes(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), max_bytes=10)
+    cache.set("small", "x" * 10)
+    cache.set("large", "x" * 11)
+
+    assert cache.get("large") is None
+    assert cache.get("small") is not None
+
+
+def test_expires_entries_after_ttl(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), max_bytes=1024, ttl=60)
+    cache.set("key", "value")
+
+    clock[0] += 60
+    assert cache.get("key") == "value"
+
+    # 조회는 accessed_at만 갱신하므로 created_at 기준으로 만료됨
+    clock[0] += 1
+    assert cache.get("key") is None
+
+
+def test_persists_between_instances(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    SQLiteCache(path, max_bytes=1024).set("key", "value")
+
+    assert SQLiteCache(path, max_bytes=1024).get("key") == "value"
+
+
+def test_delete(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), max_bytes=1024)
+    cache.set("key", "value")
+    cache.delete("key")
+    cache.delete("missing")
+
+    assert cache.get("key") is None
@@ -2,6 +2,7 @@ import os
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from functools import wraps
+from typing import Optional
 
 import mysql.connector
 from dotenv import load_dotenv
@@ -75,6 +76,22 @@ def fetch_users():
     return users
 
 
+def fetch_history_id(user_id: int) -> Optional[str]:
+    with db_cursor() as cursor:
+        cursor.execute("SELECT history_id FROM user_sync_tb WHERE user_id = %s", (user_id,))
+        row = cursor.fetchone()
+    return row["history_id"] if row else None
+
+
+def update_history_id(user_id: int, history_id: str):
+    with db_cursor() as cursor:
+        query = (
+            "INSERT INTO user_sync_tb (user_id, history_id) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE history_id = VALUES(history_id)"
+        )
+        cursor.execute(query, (user_id, history_id))
+
+
 def is_expired(expiry_time: datetime) -> bool:
     if not expiry_time:
         return True
@@ -1,3 +1,5 @@
+import asyncio
+import inspect
 import time
 from functools import wraps
 from typing import Callable
@@ -7,10 +9,13 @@ import openai
 
 def retry_with_exponential_backoff(max_retry: int = 9, base_wait: int = 1):
     """
-    지수 백오프 방식으로 재시도하는 데코레이터
+    지수 백오프 방식으로 재시도하는 데코레이터 (async 함수에도 적용 가능)
     """
 
     def decorator(func: Callable):
+        if inspect.iscoroutinefunction(func):
+            return _async_retry_wrapper(func, max_retry, base_wait)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             wait_time = base_wait
@@ -28,3 +33,22 @@ def retry_with_exponential_backoff(max_retry: int = 9, base_wait: int = 1):
         return wrapper
 
     return decorator
+
+
+def _async_retry_wrapper(func: Callable, max_retry: int, base_wait: int):
+    # 대기 중에도 다른 코루틴이 실행될 수 있도록 time.sleep 대신 asyncio.sleep 사용
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        wait_time = base_wait
+        for attempt in range(max_retry):
+            try:
+                return await func(*args, **kwargs)
+            except openai.RateLimitError as e:
+                print(f"[RateLimitError] 재시도 {attempt+1}/{max_retry}회: {e}")
+                if attempt < max_retry - 1:
+                    await asyncio.sleep(wait_time)
+                    wait_time *= 2
+                else:
+                    raise e  # 최대 재시도 횟수 초과 시 에러 발생
+
+    return wrapper
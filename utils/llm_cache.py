@@ -0,0 +1,112 @@
+import hashlib
+import json
+import threading
+from typing import Optional
+
+from openai import AsyncOpenAI, OpenAI
+from openai.types.chat.chat_completion import ChatCompletion
+from openai.types.completion_usage import CompletionUsage
+
+from utils.configuration import Config
+from utils.sqlite_cache import SQLiteCache
+from utils.token_usage_counter import TokenUsageCounter
+
+
+class LLMResponseCache:
+    """
+    chat.completions.create 응답을 SQLite 파일에 저장해 두고 같은 요청에는 저장된 응답을 반환하는 캐시입니다.
+    요청 키는 base URL과 model, messages, response_format, temperature, seed 등 요청 인자 전체로 만듭니다.
+    config.yml의 llm_cache.enabled가 false이면 항상 API를 호출합니다.
+
+    캐시에서 반환한 응답의 usage는 0으로 설정되므로 호출하는 쪽에서 기록하는 토큰 사용량에 포함되지 않으며,
+    대신 절약한 토큰 수를 TokenUsageCounter에 기록합니다.
+    """
+
+    _cache: Optional[SQLiteCache] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def create(cls, client: OpenAI, use_cache: bool = True, **kwargs) -> ChatCompletion:
+        """
+        client.chat.completions.create(**kwargs)와 같지만 캐시된 응답이 있으면 API를 호출하지 않습니다.
+        use_cache가 False이면 저장된 응답을 사용하지 않고 API를 호출하며, 받은 응답으로 저장된 응답을 교체합니다.
+        (같은 요청을 다시 생성해야 하는 경우에 사용합니다.)
+        """
+        cache = cls.get_cache()
+        if cache is None:
+            return client.chat.completions.create(**kwargs)
+
+        key = cls._build_key(client, kwargs)
+        cached_response = cls._load(cache, key) if use_cache else None
+        if cached_response is not None:
+            return cached_response
+
+        response = client.chat.completions.create(**kwargs)
+        cache.set(key, response.model_dump_json())
+        return response
+
+    @classmethod
+    async def acreate(cls, client: AsyncOpenAI, use_cache: bool = True, **kwargs) -> ChatCompletion:
+        """
+        create의 비동기 버전입니다.
+        """
+        cache = cls.get_cache()
+        if cache is None:
+            return await client.chat.completions.create(**kwargs)
+
+        key = cls._build_key(client, kwargs)
+        cached_response = cls._load(cache, key) if use_cache else None
+        if cached_response is not None:
+            return cached_response
+
+        response = await client.chat.completions.create(**kwargs)
+        cache.set(key, response.model_dump_json())
+        return response
+
+    @classmethod
+    def invalidate(cls, client: OpenAI | AsyncOpenAI, **kwargs):
+        """
+        같은 요청 인자로 저장된 응답을 삭제합니다. 검증에 실패한 응답이 이후 실행에서 재사용되지 않도록 할 때 사용합니다.
+        """
+        cache = cls.get_cache()
+        if cache is not None:
+            cache.delete(cls._build_key(client, kwargs))
+
+    @classmethod
+    def get_cache(cls) -> Optional[SQLiteCache]:
+        """
+        응답 캐시를 반환합니다. 설정에서 비활성화된 경우 None을 반환합니다.
+        """
+        cache_config = Config.config["llm_cache"]
+        if not cache_config["enabled"]:
+            return None
+
+        with cls._lock:
+            if cls._cache is None:
+                ttl_hours = cache_config["ttl_hours"]
+                cls._cache = SQLiteCache(
+                    cache_config["path"],
+                    max_bytes=cache_config["max_size_mb"] * 1024 * 1024,
+                    ttl=ttl_hours * 3600 if ttl_hours else None,
+                )
+        return cls._cache
+
+    @staticmethod
+    def _build_key(client, kwargs: dict) -> str:
+        request = {"base_url": str(client.base_url), **kwargs}
+        serialized = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _load(cache: SQLiteCache, key: str) -> Optional[ChatCompletion]:
+        value = cache.get(key)
+        TokenUsageCounter.add_cache_lookup("llm_response", value is not None)
+        if value is None:
+            return None
+
+        response = ChatCompletion.model_validate_json(value)
+        if response.usage is not None:
+            TokenUsageCounter.add_saved_usage(response.model, response.usage.total_tokens)
+        return response.model_copy(
+            update={"usage": CompletionUsage(prompt_tokens=0, completion_tokens=0, total_tokens=0)}
+        )
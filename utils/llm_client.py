@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from utils.configuration import Config
+from utils.rate_limiter import AsyncRateLimitedTransport, RateLimitedTransport, RateLimiter
+
+UPSTAGE_BASE_URL = "https://api.upstage.ai/v1/solar"
+
+
+class LLMClient:
+    """
+    프로세스 전체에서 (API key, base URL) 조합마다 하나의 OpenAI 클라이언트를 공유하는 레지스트리입니다.
+    클라이언트를 재사용하여 HTTP keep-alive 연결과 TLS 세션을 호출 간에 유지합니다.
+
+    async 클라이언트의 연결은 생성된 event loop에 묶이므로 event loop마다 따로 관리합니다.
+    연결 풀 크기와 timeout은 config.yml의 llm_client 설정을 따르며,
+    rate_limit.enabled가 true이면 모든 요청이 API key별 RateLimiter를 거쳐 전송됩니다.
+    """
+
+    _clients: dict[tuple[str, Optional[str]], OpenAI] = {}
+    _async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, api_key: Optional[str] = None, base_url: Optional[str] = UPSTAGE_BASE_URL) -> OpenAI:
+        """
+        Args:
+            api_key (str, optional): API key. None이면 현재 사용자의 Upstage API key를 사용합니다.
+            base_url (str, optional): API base URL. None이면 OpenAI 기본 URL을 사용합니다.
+
+        Returns:
+            OpenAI: 공유 클라이언트
+        """
+        key = (cls._resolve_api_key(api_key, base_url), base_url)
+        with cls._lock:
+            if key not in cls._clients:
+                cls._clients[key] = OpenAI(
+                    api_key=key[0], base_url=base_url, http_client=DefaultHttpxClient(**cls._http_options(key[0]))
+                )
+            return cls._clients[key]
+
+    @classmethod
+    def get_async(cls, api_key: Optional[str] = None, base_url: Optional[str] = UPSTAGE_BASE_URL) -> AsyncOpenAI:
+        """
+        현재 실행 중인 event loop에서 사용할 공유 async 클라이언트를 반환합니다. 코루틴 안에서 호출해야 합니다.
+        """
+        loop = asyncio.get_running_loop()
+        key = (cls._resolve_api_key(api_key, base_url), base_url)
+        with cls._lock:
+            loop_clients = cls._async_clients.setdefault(loop, {})
+            if key not in loop_clients:
+                loop_clients[key] = AsyncOpenAI(
+                    api_key=key[0],
+                    base_url=base_url,
+                    http_client=DefaultAsyncHttpxClient(**cls._http_options(key[0], is_async=True)),
+                )
+            return loop_clients[key]
+
+    @classmethod
+    def close(cls):
+        """
+        공유 중인 동기 클라이언트의 연결을 모두 닫습니다.
+        """
+        with cls._lock:
+            for client in cls._clients.values():
+                client.close()
+            cls._clients.clear()
+
+    @classmethod
+    async def aclose_async(cls):
+        """
+        현재 event loop에서 만든 async 클라이언트의 연결을 모두 닫습니다.
+        asyncio.run이 끝나면 event loop도 닫히므로, 그 안에서 만든 클라이언트는 loop가 끝나기 전에 닫아야 합니다.
+        """
+        loop = asyncio.get_running_loop()
+        with cls._lock:
+            loop_clients = cls._async_clients.pop(loop, {})
+        for client in loop_clients.values():
+            await client.close()
+
+    @staticmethod
+    def _resolve_api_key(api_key: Optional[str], base_url: Optional[str]) -> Optional[str]:
+        # OpenAI 기본 URL이면 None을 그대로 넘겨 OPENAI_API_KEY 환경 변수를 사용
+        if api_key is None and base_url == UPSTAGE_BASE_URL:
+            return Config.user_upstage_api_key
+        return api_key
+
+    @staticmethod
+    def _http_options(api_key: Optional[str], is_async: bool = False) -> dict:
+        client_config = Config.config["llm_client"]
+        limits = httpx.Limits(
+            max_connections=client_config["max_connections"],
+            max_keepalive_connections=client_config["max_keepalive_connections"],
+            keepalive_expiry=client_config["keepalive_expiry"],
+        )
+        options = {"timeout": httpx.Timeout(client_config["timeout"], connect=client_config["connect_timeout"])}
+        if not Config.config["rate_limit"]["enabled"]:
+            return {**options, "limits": limits}
+
+        # 같은 API key를 쓰는 모든 클라이언트(동기/비동기)가 하나의 RateLimiter를 공유
+        # transport를 직접 지정하면 httpx가 limits 인자를 무시하므로 연결 풀 설정은 transport에 전달
+        limiter = RateLimiter.get(api_key)
+        if is_async:
+            return {**options, "transport": AsyncRateLimitedTransport(httpx.AsyncHTTPTransport(limits=limits), limiter)}
+        return {**options, "transport": RateLimitedTransport(httpx.HTTPTransport(limits=limits), limiter)}
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from utils.configuration import Config
+from utils.token_usage_counter import TokenUsageCounter
+
+# "1s", "6m0s", "20ms", "0.5" 형태의 reset 시간 파싱용
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)?")
+_DURATION_FORMAT = re.compile(r"(?:\d+(?:\.\d+)?(?:ms|h|m|s)?)+")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}
+
+
+class TokenBucket:
+    """
+    분당 capacity만큼 채워지는 token bucket입니다.
+    잔량이 부족해도 예약은 받아 잔량을 음수로 만들고, 그만큼 기다려야 하는 시간을 반환합니다(선착순 대기).
+    """
+
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = capacity_per_minute
+        self.available = capacity_per_minute
+        self.updated_at = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        self._refill()
+        # 한도보다 큰 요청도 한 번은 보낼 수 있도록 capacity까지만 차감
+        self.available -= min(amount, self.capacity)
+        return max(-self.available / self.rate, 0.0)
+
+    def update(self, limit: Optional[float] = None, remaining: Optional[float] = None, reset: Optional[float] = None):
+        """
+        서버가 알려준 한도(limit), 잔량(remaining), 잔량이 다시 찰 때까지의 시간(reset)을 반영합니다.
+        서버 기준 잔량이 더 적은 경우에만 줄여서, 진행 중인 다른 요청의 예약은 유지합니다.
+        """
+        self._refill()
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            available = remaining - self.rate * reset if reset and remaining <= 0 else remaining
+            self.available = min(self.available, available)
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / 60
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class RateLimiter:
+    """
+    API key 하나의 분당 요청 수(RPM)와 분당 토큰 수(TPM)를 요청 전에 제한합니다.
+    응답의 x-ratelimit-* 헤더와 429 응답의 retry-after 헤더로 실제 한도와 잔량을 학습합니다.
+    """
+
+    _limiters: dict[str, "RateLimiter"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, expected_completion_tokens: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.expected_completion_tokens = expected_completion_tokens
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, api_key: Optional[str]) -> "RateLimiter":
+        """
+        API key별로 공유되는 RateLimiter를 반환합니다. 한도는 config.yml의 rate_limit 설정에서 시작합니다.
+        """
+        with cls._registry_lock:
+            if api_key not in cls._limiters:
+                rate_limit_config = Config.config["rate_limit"]
+                cls._limiters[api_key] = cls(
+                    rate_limit_config["requests_per_minute"],
+                    rate_limit_config["tokens_per_minute"],
+                    rate_limit_config["expected_completion_tokens"],
+                )
+            return cls._limiters[api_key]
+
+    def reserve(self, request: httpx.Request) -> float:
+        """
+        요청 1회와 예상 토큰 수를 예약하고, 요청 전에 기다려야 하는 시간(초)을 반환합니다.
+        """
+        estimated_tokens = self._estimate_tokens(request)
+        with self._lock:
+            return max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    def update(self, response: httpx.Response):
+        headers = response.headers
+        with self._lock:
+            if response.status_code == 429:
+                # 한도를 넘은 경우 retry-after 동안 모든 요청이 기다리도록 잔량을 비움
+                retry_after = _parse_duration(headers.get("retry-after")) or 1.0
+                self.requests.update(remaining=0, reset=retry_after)
+                self.tokens.update(remaining=0, reset=retry_after)
+                return
+
+            for bucket, suffix in ((self.requests, "requests"), (self.tokens, "tokens")):
+                bucket.update(
+                    limit=_parse_number(headers.get(f"x-ratelimit-limit-{suffix}")),
+                    remaining=_parse_number(headers.get(f"x-ratelimit-remaining-{suffix}")),
+                    reset=_parse_duration(headers.get(f"x-ratelimit-reset-{suffix}")),
+                )
+
+    def _estimate_tokens(self, request: httpx.Request) -> int:
+        try:
+            body = json.loads(request.content or b"{}")
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return TokenUsageCounter.estimate_tokens(request.content.decode("utf-8", errors="replace"))
+        if not isinstance(body, dict):
+            return 0
+
+        prompt_tokens = TokenUsageCounter.estimate_tokens(json.dumps(body.get("messages", body.get("input", ""))))
+        completion_tokens = body.get("max_tokens") or self.expected_completion_tokens
+        return prompt_tokens + completion_tokens * (body.get("n") or 1)
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """
+    요청을 보내기 전에 RateLimiter로 속도를 조절하는 httpx transport입니다.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, limiter: RateLimiter):
+        self._transport = transport
+        self._limiter = limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        time.sleep(self._limiter.reserve(request))
+        response = self._transport.handle_request(request)
+        self._limiter.update(response)
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    RateLimitedTransport의 비동기 버전입니다. 기다리는 동안 다른 코루틴이 실행될 수 있습니다.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limiter: RateLimiter):
+        self._transport = transport
+        self._limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self._limiter.reserve(request))
+        response = await self._transport.handle_async_request(request)
+        self._limiter.update(response)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    # HTTP-date 형식의 retry-after 등 해석할 수 없는 값은 무시
+    if not value or not _DURATION_FORMAT.fullmatch(value.strip()):
+        return None
+    return sum(
+        float(number) * _DURATION_UNITS[unit or None] for number, unit in _DURATION_PATTERN.findall(value.strip())
+    )
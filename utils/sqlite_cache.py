@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class SQLiteCache:
+    """
+    SQLite 파일에 문자열 값을 저장하는 key-value 캐시입니다.
+    저장된 값의 총 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제하고(LRU),
+    ttl(초)이 지정된 경우 만료된 항목은 조회 시 삭제합니다.
+
+    Args:
+        path (str): SQLite 파일 경로
+        max_bytes (int): 캐시에 저장할 값들의 최대 총 크기(byte)
+        ttl (float, optional): 항목의 유효 시간(초). None이면 만료되지 않습니다.
+
+    Attributes:
+        hits (int): 캐시 적중 횟수
+        misses (int): 캐시 미스 횟수
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl: Optional[float] = None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        # 여러 스레드에서 같은 커넥션을 사용하므로 lock으로 접근을 직렬화
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON cache (accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and row[1] + self.ttl < now:
+                self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict()
+
+    def delete(self, key: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def _evict(self):
+        total_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+
+        expired_keys = []
+        for key, size in self._connection.execute("SELECT key, size FROM cache ORDER BY accessed_at"):
+            if total_bytes <= self.max_bytes:
+                break
+            expired_keys.append((key,))
+            total_bytes -= size
+        self._connection.executemany("DELETE FROM cache WHERE key = ?", expired_keys)
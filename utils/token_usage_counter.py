@@ -1,3 +1,4 @@
+import math
 from collections import defaultdict
 
 import matplotlib.pyplot as plt
@@ -6,6 +7,8 @@ import numpy as np
 
 class TokenUsageCounter:
     token_usage_records = []
+    token_saved_records = []
+    cache_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
 
     @classmethod
     def add_usage(cls, agent_name: str, usage_type: str, tokens: int):
@@ -14,6 +17,20 @@ class TokenUsageCounter:
         """
         cls.token_usage_records.append({"agent_name": agent_name, "usage_type": usage_type, "tokens": tokens})
 
+    @classmethod
+    def add_cache_lookup(cls, cache_name: str, hit: bool):
+        """
+        캐시 조회 결과(적중 여부)를 캐시 이름별로 기록합니다.
+        """
+        cls.cache_stats[cache_name]["hits" if hit else "misses"] += 1
+
+    @classmethod
+    def add_saved_usage(cls, model_name: str, tokens: int):
+        """
+        LLM 응답 캐시를 사용하여 API를 호출하지 않고 절약한 토큰 수를 기록합니다.
+        """
+        cls.token_saved_records.append({"model_name": model_name, "tokens": tokens})
+
     @staticmethod
     def plot_token_cost():
         """
@@ -61,6 +78,15 @@ class TokenUsageCounter:
             # 막대를 오른쪽으로 조금씩 이동
             plt.bar(x + i * bar_width, y_values, bar_width, label=agent)
 
+        saved_tokens = TokenUsageCounter.get_total_saved_tokens()
+        if saved_tokens > 0:
+            print(f"Saved by LLM cache: {saved_tokens} tokens\n")
+
+        for cache_name, stats in TokenUsageCounter.cache_stats.items():
+            total = stats["hits"] + stats["misses"]
+            hit_rate = stats["hits"] / total if total > 0 else 0.0
+            print(f"Cache: {cache_name}\nHits: {stats['hits']}, Misses: {stats['misses']} ({hit_rate:.1%})\n")
+
         # X축 레이블을 usage_type의 중앙에 놓기
         plt.xticks(x + (bar_width * (len(agents_list) - 1) / 2), usage_types_list, rotation=30, ha="right")
 
@@ -71,6 +97,17 @@ class TokenUsageCounter:
         plt.tight_layout()
         plt.savefig("token-usage.png")
 
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """
+        API 호출 없이 텍스트의 토큰 수를 추정합니다. (UTF-8 기준 약 4 byte당 1 토큰)
+        """
+        return math.ceil(len(text.encode("utf-8")) / 4)
+
     @staticmethod
     def get_total_token_cost():
         return sum(record["tokens"] for record in TokenUsageCounter.token_usage_records)
+
+    @staticmethod
+    def get_total_saved_tokens():
+        return sum(record["tokens"] for record in TokenUsageCounter.token_saved_records)